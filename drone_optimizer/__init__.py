@@ -1,7 +1,16 @@
 from .drone_model import Drone
-from .weather_model import WeatherForecast
-from .genetic_algorithm import GeneticAlgorithm, Individual
+from .weather_model import WeatherForecast, load_forecast
+from .genetic_algorithm import GeneticAlgorithm, Individual, Population
 from .route_calculator import RouteCalculator
-from .csv_exporter import export_solution
+from .csv_exporter import export_solution, export_fleet_solution, export_replanned_solution, export_pareto_front
+from .route_evaluator import RouteEvaluator, evaluate_route, load_route
+from .fleet import FleetOptimizer, split_ceps_into_clusters
+from .hierarchical import HierarchicalSolver
+from .replan import RollingReplanner, executed_state
+from .shared_data import SharedCepData
+from .pareto import ParetoGeneticAlgorithm
 
-__all__ = ['Drone', 'WeatherForecast', 'GeneticAlgorithm', 'Individual', 'RouteCalculator', 'export_solution']
\ No newline at end of file
+__all__ = ['Drone', 'WeatherForecast', 'load_forecast', 'GeneticAlgorithm', 'Individual', 'Population', 'RouteCalculator', 'export_solution', 'export_fleet_solution', 'export_replanned_solution', 'export_pareto_front',
+           'RouteEvaluator', 'evaluate_route', 'load_route',
+           'FleetOptimizer', 'split_ceps_into_clusters', 'HierarchicalSolver',
+           'RollingReplanner', 'executed_state', 'SharedCepData', 'ParetoGeneticAlgorithm']
\ No newline at end of file
@@ -1,15 +1,59 @@
 import pandas as pd
 from .route_calculator import RouteCalculator
+from .route_evaluator import _normalize_cep
 
 def export_solution(best_solution, file_path):
     """Exporta a melhor solução para arquivo CSV"""
+    df = pd.DataFrame(solution_records(best_solution))
+    df.to_csv(file_path, index=False)
+    print(f"Solução exportada para {file_path}")
+
+def export_fleet_solution(solutions, file_path):
+    """Exporta as rotas de todos os drones da frota para um único CSV"""
+    records = []
+    for drone_id, solution in enumerate(solutions, start=1):
+        for record in solution_records(solution):
+            records.append({'Drone': drone_id, **record})
+    
+    df = pd.DataFrame(records)
+    df.to_csv(file_path, index=False)
+    print(f"Solução da frota exportada para {file_path}")
+
+def export_pareto_front(front, file_path):
+    """Exporta as rotas da frente de Pareto (coluna Solucao identifica cada compromisso)"""
+    records = []
+    for solution_id, solution in enumerate(front, start=1):
+        for record in solution_records(solution):
+            records.append({'Solucao': solution_id, **record})
+    
+    df = pd.DataFrame(records)
+    df.to_csv(file_path, index=False)
+    print(f"Frente de Pareto exportada para {file_path}")
+
+def export_replanned_solution(schedule_file, executed_legs, best_solution, file_path):
+    """Exporta o plano replanejado: trechos já executados do plano original e o novo restante"""
+    executed = pd.read_csv(schedule_file, dtype={'CEP_inicial': str, 'CEP_final': str}).iloc[:executed_legs]
+    for column in ('CEP_inicial', 'CEP_final'):
+        executed[column] = executed[column].map(_normalize_cep)
+    df = pd.concat([executed, pd.DataFrame(solution_records(best_solution))], ignore_index=True)
+    df.to_csv(file_path, index=False)
+    print(f"Plano replanejado exportado para {file_path}")
+
+def solution_records(best_solution):
+    """Gera os registros (um por trecho) de uma solução"""
     route_calculator = RouteCalculator()
     records = []
     
-    current_time = best_solution._time_to_seconds('06:00:00')
+    current_time = best_solution._time_to_seconds(best_solution.departure_times[0])
     current_day = 1
     current_battery = best_solution.drone.calculate_autonomy(best_solution.speeds[0])
     
+    # Replanejamento: continua do estado em que o drone está
+    start_state = best_solution.start_state or {}
+    current_day = start_state.get('day', current_day)
+    if start_state.get('battery') is not None:
+        current_battery = start_state['battery']
+    
     max_day_time = best_solution._time_to_seconds('19:00:00')
     late_penalty_time = best_solution._time_to_seconds('17:00:00')
     
@@ -75,7 +119,4 @@ def export_solution(best_solution, file_path):
             current_day += 1
             current_time = best_solution._time_to_seconds('06:00:00')
     
-    # Criar DataFrame e exportar
-    df = pd.DataFrame(records)
-    df.to_csv(file_path, index=False)
-    print(f"Solução exportada para {file_path}")
\ No newline at end of file
+    return records
\ No newline at end of file
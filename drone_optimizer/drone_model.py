@@ -1,43 +1,93 @@
+import copy
 import math
+import numpy as np
+
+def _table_parameter(name):
+    """Atributo que define as tabelas de velocidade: ao ser alterado, as tabelas são refeitas"""
+    def get(self):
+        return self.__dict__['_' + name]
+
+    def set(self, value):
+        self.__dict__['_' + name] = value
+        self._build_tables()
+
+    return property(get, set)
+
 
 class Drone:
-    def __init__(self):
-        self.max_speed = 96  # km/h
-        self.min_speed = 36  # km/h
-        self.base_autonomy = 5000 * 0.93  
-        self.stop_penalty = 72  
-        self.recharge_cost = 80.0 
-        
+    # Tabelas já calculadas por perfil, para reaproveitá-las entre execuções
+    _profile_cache = {}
+
+    max_speed = _table_parameter('max_speed')  # km/h
+    min_speed = _table_parameter('min_speed')  # km/h
+    speed_step = _table_parameter('speed_step')
+    base_autonomy = _table_parameter('base_autonomy')
+    reference_speed = _table_parameter('reference_speed')
+
+    def __init__(self, max_speed=96, min_speed=36, speed_step=4, base_autonomy=5000 * 0.93,
+                 stop_penalty=72, recharge_cost=80.0, reference_speed=36):
+        self._max_speed = max_speed
+        self._min_speed = min_speed
+        self._speed_step = speed_step
+        self._base_autonomy = base_autonomy
+        self._reference_speed = reference_speed
+        self.stop_penalty = stop_penalty
+        self.recharge_cost = recharge_cost
+        self._build_tables()
+
+    def _build_tables(self):
+        """Tabelas por índice de velocidade (mesma ordem de get_available_speeds), só leitura"""
+        self.speeds = np.arange(self.min_speed, self.max_speed + 1, self.speed_step)
+        self.autonomy_table = self.base_autonomy * (self.reference_speed / self.speeds) ** 2
+        self.seconds_per_km = 3600 / self.speeds
+        for table in (self.speeds, self.autonomy_table, self.seconds_per_km):
+            table.flags.writeable = False
+        self._available_speeds = tuple(self.speeds.tolist())
+
+    @classmethod
+    def from_profile(cls, profile):
+        """Drone a partir de um perfil (dicionário com os parâmetros do construtor)
+
+        Cada chamada recebe um drone próprio; as tabelas (só leitura) são compartilhadas.
+        """
+        key = tuple(sorted(profile.items()))
+        if key not in cls._profile_cache:
+            cls._profile_cache[key] = cls(**profile)
+        return copy.copy(cls._profile_cache[key])
+
     def calculate_autonomy(self, speed):
         """Calcula autonomia em segundos para uma dada velocidade"""
         if speed < self.min_speed or speed > self.max_speed:
             raise ValueError(f"Velocidade {speed} km/h fora dos limites permitidos")
-        
-        return self.base_autonomy * (36 / speed) ** 2
-        
+
+        if self.validate_speed(speed):
+            return float(self.autonomy_table[self.speed_index(speed)])
+        return self.base_autonomy * (self.reference_speed / speed) ** 2
+
     def calculate_energy_consumption(self, distance_km, speed):
         """Calcula consumo de energia para uma distância e velocidade"""
         if speed == 0:
             return float('inf')
-        
+
         flight_time_seconds = (distance_km / speed) * 3600
         return flight_time_seconds
-        
+
     def get_available_speeds(self):
-        """Retorna lista de velocidades permitidas (múltiplos de 4 entre min e max)"""
-        speeds = []
-        for speed in range(self.min_speed, self.max_speed + 1, 4):
-            speeds.append(speed)
-        return speeds
-        
+        """Retorna lista de velocidades permitidas (múltiplos do passo entre min e max)"""
+        return list(self._available_speeds)
+
+    def speed_index(self, speeds):
+        """Índice(s) nas tabelas para velocidade(s) permitida(s)"""
+        return (np.asarray(speeds) - self.min_speed) // self.speed_step
+
     def calculate_flight_time(self, distance_km, effective_speed):
         """Calcula tempo de voo em segundos"""
         if effective_speed == 0:
             return float('inf')
         return (distance_km / effective_speed) * 3600
-        
+
     def validate_speed(self, speed):
         """Verifica se velocidade é válida"""
-        return (speed >= self.min_speed and 
-                speed <= self.max_speed and 
-                speed % 4 == 0)
\ No newline at end of file
+        return (speed >= self.min_speed and
+                speed <= self.max_speed and
+                (speed - self.min_speed) % self.speed_step == 0)
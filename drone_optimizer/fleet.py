@@ -0,0 +1,196 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from .genetic_algorithm import GeneticAlgorithm, Individual, DEPOT_CEP, make_seed_sequence
+from .route_evaluator import RouteEvaluator
+from .shared_data import SharedCepData, create_shared_data
+
+
+def split_ceps_into_clusters(ceps, num_clusters):
+    """Divide os CEPs em setores angulares balanceados em torno do Unibrasil
+
+    Cada cluster é uma lista de CEPs que começa pelo Unibrasil.
+    """
+    depot, others, angles = _depot_angles(ceps)
+    if not others:
+        return [[depot]]
+
+    order = np.argsort(_sweep_positions(angles, _sweep_start(angles)), kind='stable')
+
+    num_clusters = max(1, min(num_clusters, len(others)))
+    return [[depot] + [others[i] for i in chunk] for chunk in np.array_split(order, num_clusters)]
+
+
+def _depot_angles(ceps):
+    """(Unibrasil, demais CEPs, ângulo de cada um em torno do Unibrasil)"""
+    depot = next((cep for cep in ceps if cep['cep'] == DEPOT_CEP), ceps[0])
+    others = [cep for cep in ceps if cep is not depot]
+    latitudes = np.array([cep['latitude'] for cep in others])
+    longitudes = np.array([cep['longitude'] for cep in others])
+    return depot, others, np.arctan2(latitudes - depot['latitude'], longitudes - depot['longitude'])
+
+
+def _sweep_start(angles):
+    """Ângulo onde a varredura começa: logo após o maior vão angular
+
+    Assim a varredura não parte um grupo de CEPs ao meio.
+    """
+    sorted_angles = np.sort(angles)
+    gaps = np.diff(np.append(sorted_angles, sorted_angles[0] + 2 * np.pi))
+    return sorted_angles[(int(np.argmax(gaps)) + 1) % len(sorted_angles)]
+
+
+def _sweep_positions(angles, start):
+    """Posição de cada ângulo na varredura (radianos a partir de start, em [0, 2pi))"""
+    return (np.asarray(angles) - start) % (2 * np.pi)
+
+
+def _optimize_cluster(args):
+    """Executa o AG de um drone (função de topo para rodar em outro processo)
+
+    Com dados compartilhados, ceps chega como índices e os CEPs são lidos da memória compartilhada.
+    """
+    config, ceps, drone, weather = args
+    if config.get('shared_data_handle') is not None:
+        ceps = SharedCepData.attach(config['shared_data_handle']).ceps(ceps)
+    best_individual, fitness_history = GeneticAlgorithm(config, ceps, drone, weather).run()
+    return best_individual
+
+
+class FleetOptimizer:
+    """Planeja uma sub-rota por drone, otimizando os clusters em paralelo"""
+
+    def __init__(self, config, ceps, drone, weather):
+        self.config = config
+        self.ceps = ceps
+        self.drone = drone
+        self.weather = weather
+        self.evaluator = RouteEvaluator(ceps, drone, weather)
+        # Início da varredura dos setores (o mesmo de split_ceps_into_clusters)
+        _, others, angles = _depot_angles(ceps)
+        self.sweep_start = _sweep_start(angles) if others else 0.0
+        self.seed_sequence = make_seed_sequence(config.get('seed'))
+        self.solutions = []
+
+    def run(self):
+        """Otimiza a frota e retorna (soluções por drone, custo total)"""
+        clusters = split_ceps_into_clusters(self.ceps, self.config['fleet_size'])
+        print(f"Otimizando {len(clusters)} drones em paralelo...")
+
+        # Dados compartilhados: os workers recebem só o handle e os índices dos CEPs
+        shared_data = create_shared_data(self.config, self.ceps) if self.config.get('shared_data') else None
+        try:
+            tasks = []
+            for cluster, seed in zip(clusters, self.seed_sequence.spawn(len(clusters))):
+                cluster_config = dict(self.config, seed=seed)
+                if shared_data is not None:
+                    cluster_config['shared_data_handle'] = shared_data.handle
+                    cluster = shared_data.rows_for(cluster)
+                tasks.append((cluster_config, cluster, self.drone, self.weather))
+
+            workers = self.config.get('workers')
+            if len(tasks) == 1 or workers == 1:
+                solutions = [_optimize_cluster(task) for task in tasks]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    solutions = list(executor.map(_optimize_cluster, tasks))
+
+            self.solutions = self.rebalance(solutions)
+        finally:
+            if shared_data is not None:
+                shared_data.close()
+        total_cost = sum(solution.total_cost for solution in self.solutions)
+        print(f"Frota otimizada: custo total R$ {total_cost:.2f}")
+        return self.solutions, total_cost
+
+    def rebalance(self, solutions):
+        """Move CEPs de fronteira entre drones vizinhos quando isso reduz o custo total"""
+        genomes = [self._genome(solution) for solution in solutions]
+        candidates = self.config.get('rebalance_candidates', 3)
+
+        for _ in range(self.config.get('rebalance_passes', 2)):
+            improved = False
+            for k in range(len(genomes) - 1):
+                # Últimos CEPs do setor k vão para k+1 e primeiros de k+1 vão para k
+                for source, target, from_end in ((k, k + 1, True), (k + 1, k, False)):
+                    for cep_idx in self._boundary_ceps(genomes[source], candidates, from_end):
+                        moved = self._try_move(genomes[source], genomes[target], cep_idx)
+                        if moved is not None:
+                            genomes[source], genomes[target] = moved
+                            improved = True
+            if not improved:
+                break
+
+        ceps = self.evaluator.ceps
+        return [Individual.from_genes(
+            [ceps[i] for i in _unique(genome['route'])], self.drone, self.weather,
+            [ceps[i] for i in genome['route']], genome['speeds'], genome['recharges']
+        ) for genome in genomes]
+
+    def _genome(self, solution):
+        """Genes de uma solução com a rota em índices globais e custo avaliado"""
+        genome = {
+            'route': list(self.evaluator.route_to_indices(solution.route)),
+            'speeds': solution.speeds,
+            'recharges': solution.recharges,
+        }
+        genome['cost'], genome['is_valid'] = self._score(genome)
+        return genome
+
+    def _score(self, genome):
+        result = self.evaluator.evaluate_batch([genome['route']], [genome['speeds']], [genome['recharges']])
+        return float(result['total_cost'][0]), bool(result['is_valid'][0])
+
+    def _boundary_ceps(self, genome, count, from_end):
+        """CEPs do cluster mais próximos da fronteira angular com o vizinho
+
+        A ordem é a da varredura de split_ceps_into_clusters, então um setor que
+        cruza +-pi continua com as pontas certas.
+        """
+        points = genome['route'][1:-1]
+        depot = genome['route'][0]
+        angles = np.arctan2(self.evaluator.latitudes[points] - self.evaluator.latitudes[depot],
+                            self.evaluator.longitudes[points] - self.evaluator.longitudes[depot])
+        order = np.argsort(_sweep_positions(angles, self.sweep_start), kind='stable')
+        chosen = order[::-1][:count] if from_end else order[:count]
+        return [points[i] for i in chosen]
+
+    def _try_move(self, source, target, cep_idx):
+        """Remove o CEP da rota de origem e insere na posição mais barata da rota de destino"""
+        if cep_idx not in source['route'] or len(source['route']) <= 3:
+            return None
+
+        # Remoção: os trechos de chegada e saída do CEP viram um único trecho
+        p = source['route'].index(cep_idx)
+        new_source = {
+            'route': source['route'][:p] + source['route'][p + 1:],
+            'speeds': source['speeds'][:p] + source['speeds'][p + 1:],
+            'recharges': (source['recharges'][:p - 1]
+                          + [source['recharges'][p - 1] or source['recharges'][p]]
+                          + source['recharges'][p + 1:]),
+        }
+
+        # Inserção mais barata em distância, repetindo a velocidade do trecho dividido
+        route = np.array(target['route'])
+        detours = np.stack([route[:-1], np.full(len(route) - 1, cep_idx), route[1:]], axis=1)
+        detour_distances, _ = self.evaluator.leg_geometry(detours)
+        base_distances, _ = self.evaluator.leg_geometry(route[np.newaxis])
+        q = int(np.argmin(detour_distances.sum(axis=1) - base_distances[0]))
+        new_target = {
+            'route': target['route'][:q + 1] + [cep_idx] + target['route'][q + 1:],
+            'speeds': target['speeds'][:q + 1] + [target['speeds'][q]] + target['speeds'][q + 1:],
+            'recharges': target['recharges'][:q + 1] + [False] + target['recharges'][q + 1:],
+        }
+
+        new_source['cost'], new_source['is_valid'] = self._score(new_source)
+        new_target['cost'], new_target['is_valid'] = self._score(new_target)
+        if not (new_source['is_valid'] and new_target['is_valid']):
+            return None
+        if (source['is_valid'] and target['is_valid']
+                and new_source['cost'] + new_target['cost'] >= source['cost'] + target['cost']):
+            return None
+        return new_source, new_target
+
+
+def _unique(indices):
+    """Índices sem repetição, na ordem em que aparecem"""
+    return list(dict.fromkeys(int(i) for i in indices))
@@ -1,165 +1,316 @@
 import numpy as np
-import random
-from copy import deepcopy
-from .route_calculator import RouteCalculator
+from .route_evaluator import RouteEvaluator, FAIL_DEADLINE, FAIL_BATTERY, FAIL_BATTERY_AFTER_STOP
+from .speed_decoder import SpeedRechargeDecoder
+from .shared_data import SharedCepData
+
+DEPOT_CEP = '82821020'  # Unibrasil
+
+
+def make_seed_sequence(seed=None):
+    """SeedSequence a partir de um inteiro, de outra SeedSequence ou None (aleatória)"""
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+class Population:
+    """População armazenada como estrutura de arrays (uma linha por indivíduo)"""
+
+    # Arrays com uma linha por indivíduo
+    ARRAYS = ('routes', 'speed_idx', 'recharge_bits', 'fitness', 'total_cost',
+              'total_flight_time', 'num_recharges', 'days_used', 'is_valid', 'violation', 'fail_code',
+              'fail_leg', 'genome_hash')
+
+    def __init__(self, evaluator, size):
+        self.evaluator = evaluator
+        ceps = evaluator.ceps
+        self.speed_values = evaluator.drone.speeds
+
+        # Unibrasil fixo no fim da rota; no início também, salvo em replanejamento
+        # (a rota parte do CEP do estado inicial do avaliador)
+        self.depot = next((i for i, cep in enumerate(ceps) if cep['cep'] == DEPOT_CEP), 0)
+        start_cep = (evaluator.start_state or {}).get('cep')
+        self.origin = self.depot if start_cep is None else evaluator.cep_index[start_cep]
+        self.others = np.array([i for i in range(len(ceps)) if i not in (self.depot, self.origin)],
+                               dtype=np.int64)
+        self.num_legs = len(self.others) + 1
+
+        route_dtype = np.int16 if len(ceps) <= np.iinfo(np.int16).max else np.int32
+        self.routes = np.full((size, self.num_legs + 1), self.depot, dtype=route_dtype)
+        self.routes[:, 0] = self.origin
+        self.speed_idx = np.zeros((size, self.num_legs), dtype=np.uint8)
+        self.recharge_bits = np.zeros((size, (self.num_legs + 7) // 8), dtype=np.uint8)
+
+        # Métricas
+        self.fitness = np.zeros(size)
+        self.total_cost = np.zeros(size)
+        self.total_flight_time = np.zeros(size)
+        self.num_recharges = np.zeros(size)
+        self.days_used = np.zeros(size)
+        self.is_valid = np.ones(size, dtype=bool)
+        self.violation = np.zeros(size)
+        self.fail_code = np.zeros(size, dtype=np.int64)  # Regra violada (FAIL_NONE se válido)
+        self.fail_leg = np.full(size, -1, dtype=np.int64)  # Trecho onde a simulação falhou (-1 se válido)
+
+        # Hash do genoma de cada linha (atualizado a cada avaliação)
+        num_genes = self.routes.shape[1] + self.speed_idx.shape[1] + self.recharge_bits.shape[1]
+        self._hash_weights = np.random.default_rng(0).integers(
+            1, np.iinfo(np.uint64).max, size=num_genes, dtype=np.uint64) | np.uint64(1)
+        self.genome_hash = np.zeros(size, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self.fitness)
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("Índice fora da população")
+        return Individual._view(self, row)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield Individual._view(self, row)
+
+    def speeds(self, rows=slice(None)):
+        """Velocidades (km/h) a partir dos índices armazenados"""
+        return self.speed_values[self.speed_idx[rows]]
+
+    def recharges(self, rows=slice(None)):
+        """Desempacota os bits de recarga"""
+        return np.unpackbits(self.recharge_bits[rows], axis=-1, count=self.num_legs).astype(bool)
+
+    def set_speeds(self, rows, speeds):
+        speeds = np.asarray(speeds)
+        idx = np.minimum(np.searchsorted(self.speed_values, speeds), len(self.speed_values) - 1)
+        if not np.array_equal(self.speed_values[idx], speeds):
+            raise ValueError("Velocidade fora das velocidades disponíveis do drone")
+        self.speed_idx[rows] = idx
+
+    def set_recharges(self, rows, recharges):
+        self.recharge_bits[rows] = np.packbits(np.asarray(recharges, dtype=bool), axis=-1)
+
+    def initialize_random(self, rng, rows=slice(None)):
+        """Inicializa as linhas indicadas com genes aleatórios"""
+        count = len(self.fitness[rows])
+
+        # Permutações aleatórias dos CEPs (excluindo Unibrasil do meio)
+        self.routes[rows, 1:-1] = rng.permuted(np.tile(self.others, (count, 1)), axis=1)
+
+        self.speed_idx[rows] = rng.integers(0, len(self.speed_values), size=(count, self.num_legs))
+
+        # Pontos de recarga (20% de chance por trecho)
+        self.set_recharges(rows, rng.random((count, self.num_legs)) < 0.2)
+
+        self.evaluate(rows)
+
+    def evaluate(self, rows=slice(None)):
+        """Avalia as linhas indicadas com o avaliador em lote"""
+        result = self.evaluator.evaluate_batch(self.routes[rows], self.speeds(rows), self.recharges(rows))
+        self.fitness[rows] = result['fitness']
+        self.total_cost[rows] = result['total_cost']
+        self.total_flight_time[rows] = result['total_flight_time']
+        self.num_recharges[rows] = result['num_recharges']
+        self.days_used[rows] = result['days_used']
+        self.is_valid[rows] = result['is_valid']
+        self.violation[rows] = result['violation']
+        self.fail_code[rows] = result['fail_code']
+        self.fail_leg[rows] = result['fail_leg']
+        self.genome_hash[rows] = self.hash_genomes(rows)
+
+    def hash_genomes(self, rows=slice(None)):
+        """Hash de 64 bits dos genes (rota, velocidades e recargas) de cada linha"""
+        genes = np.hstack([self.routes[rows], self.speed_idx[rows], self.recharge_bits[rows]]).astype(np.uint64)
+        return (genes * self._hash_weights).sum(axis=1, dtype=np.uint64)
+
+    def unique_genomes(self):
+        """Número de genomas distintos na população"""
+        return len(np.unique(self.genome_hash))
+
+    def edge_entropy(self):
+        """Entropia normalizada das arestas das rotas: 0 = todas iguais, 1 = nenhuma aresta em comum
+
+        Conta cada aresta (sem direção) na população e compara a entropia da distribuição
+        com a de uma população de clones (log L) e a de rotas sem arestas repetidas (log B*L).
+        Recontada a cada geração: só os elites sobrevivem intactos, então contagens
+        incrementais por aresta teriam de refazer quase tudo de qualquer forma.
+        """
+        count, size = self.routes.shape
+        if count < 2:
+            return 0.0
+        starts = self.routes[:, :-1].astype(np.int64)
+        ends = self.routes[:, 1:].astype(np.int64)
+        edges = np.minimum(starts, ends) * len(self.evaluator.ceps) + np.maximum(starts, ends)
+        _, counts = np.unique(edges, return_counts=True)
+        p = counts / counts.sum()
+        entropy = -(p * np.log(p)).sum()
+        return float(np.clip((entropy - np.log(size - 1)) / np.log(count), 0.0, 1.0))
+
+    def _with_arrays(self, build):
+        """Nova população com o mesmo contexto e arrays gerados por build(nome)"""
+        population = Population.__new__(Population)
+        population.__dict__.update(self.__dict__)
+        for name in self.ARRAYS:
+            setattr(population, name, build(name))
+        return population
+
+    def take(self, rows):
+        """Nova população com cópias das linhas indicadas"""
+        rows = np.asarray(rows, dtype=np.int64)
+        return self._with_arrays(lambda name: getattr(self, name)[rows])
+
+    @classmethod
+    def concatenate(cls, populations):
+        """Junta populações com o mesmo contexto numa nova população"""
+        return populations[0]._with_arrays(
+            lambda name: np.concatenate([getattr(population, name) for population in populations]))
+
+    @classmethod
+    def stack(cls, individuals):
+        """Junta indivíduos (de qualquer população) numa nova população"""
+        return individuals[0]._population._with_arrays(
+            lambda name: np.array([getattr(ind._population, name)[ind._row] for ind in individuals]))
+
 
 class Individual:
-    def __init__(self, ceps, drone, weather):
-        self.ceps = ceps
-        self.drone = drone
-        self.weather = weather
-        self.route_calculator = RouteCalculator()
-        
-        # Genes
-        self.route = []  # Ordem dos CEPs (como dicionários)
-        self.speeds = []  # Velocidades para cada trecho
-        self.recharges = []  # Pontos de recarga
-        self.departure_times = []  # Horários de partida
-        
-        # Fitness e métricas
-        self.fitness = 0.0
-        self.total_cost = 0.0
-        self.total_flight_time = 0.0
-        self.num_recharges = 0
-        self.days_used = 0
-        self.is_valid = True
-        
-        self.initialize_random()
-    
-    def initialize_random(self):
+    """Visão de uma linha de Population com a API de atributos de um indivíduo"""
+
+    __slots__ = ('_population', '_row')
+
+    def __init__(self, ceps, drone, weather, rng=None):
+        self._population = Population(RouteEvaluator(ceps, drone, weather), 1)
+        self._row = 0
+        self.initialize_random(rng)
+
+    @classmethod
+    def from_genes(cls, ceps, drone, weather, route, speeds, recharges):
+        """Cria e avalia um indivíduo a partir de genes conhecidos (sem inicialização aleatória)"""
+        individual = cls._view(Population(RouteEvaluator(ceps, drone, weather), 1), 0)
+        individual.route = route
+        individual.speeds = speeds
+        individual.recharges = recharges
+        individual.evaluate()
+        return individual
+
+    @classmethod
+    def _view(cls, population, row):
+        individual = cls.__new__(cls)
+        individual._population = population
+        individual._row = row
+        return individual
+
+    def __eq__(self, other):
+        if not isinstance(other, Individual):
+            return NotImplemented
+        return self._population is other._population and self._row == other._row
+
+    def __hash__(self):
+        return hash((id(self._population), self._row))
+
+    def copy(self):
+        """Cópia independente da população de origem"""
+        return Individual._view(self._population.take([self._row]), 0)
+
+    @property
+    def ceps(self):
+        return self._population.evaluator.ceps
+
+    @property
+    def drone(self):
+        return self._population.evaluator.drone
+
+    @property
+    def weather(self):
+        return self._population.evaluator.weather
+
+    # Genes
+    @property
+    def route(self):
+        """Ordem dos CEPs (como dicionários)"""
+        ceps = self.ceps
+        return [ceps[i] for i in self._population.routes[self._row]]
+
+    @route.setter
+    def route(self, route):
+        self._population.routes[self._row] = self._population.evaluator.route_to_indices(route)
+
+    @property
+    def speeds(self):
+        """Velocidades para cada trecho"""
+        return self._population.speeds(self._row).tolist()
+
+    @speeds.setter
+    def speeds(self, speeds):
+        self._population.set_speeds(self._row, speeds)
+
+    @property
+    def recharges(self):
+        """Pontos de recarga"""
+        return self._population.recharges(self._row).tolist()
+
+    @recharges.setter
+    def recharges(self, recharges):
+        self._population.set_recharges(self._row, recharges)
+
+    @property
+    def start_state(self):
+        """Estado inicial do avaliador (None = dia 1 às 6h com bateria cheia)"""
+        return self._population.evaluator.start_state
+
+    @property
+    def departure_times(self):
+        _, _, start_time = self._population.evaluator.initial_state()
+        return [self._seconds_to_time(start_time)]  # Começa às 6h, salvo em replanejamento
+
+    # Fitness e métricas
+    @property
+    def fitness(self):
+        return float(self._population.fitness[self._row])
+
+    @fitness.setter
+    def fitness(self, value):
+        self._population.fitness[self._row] = value
+
+    @property
+    def total_cost(self):
+        return float(self._population.total_cost[self._row])
+
+    @property
+    def total_flight_time(self):
+        return float(self._population.total_flight_time[self._row])
+
+    @property
+    def num_recharges(self):
+        return int(self._population.num_recharges[self._row])
+
+    @property
+    def days_used(self):
+        return int(self._population.days_used[self._row])
+
+    @property
+    def is_valid(self):
+        return bool(self._population.is_valid[self._row])
+
+    @property
+    def violation(self):
+        """Tamanho da violação das restrições (0 se válido)"""
+        return float(self._population.violation[self._row])
+
+    def initialize_random(self, rng=None):
         """Inicializa indivíduo com genes aleatórios"""
-        unibrasil = next((cep for cep in self.ceps if cep['cep'] == '82821020'), self.ceps[0])
-        
-        # Gerar rota aleatória (excluindo Unibrasil do meio)
-        other_ceps = [cep for cep in self.ceps if cep['cep'] != '82821020']
-        random.shuffle(other_ceps)
-        
-        # Garantir que a rota seja uma lista de dicionários
-        self.route = [unibrasil] + other_ceps + [unibrasil]
-        
-        # Gerar velocidades aleatórias válidas
-        available_speeds = self.drone.get_available_speeds()
-        self.speeds = [random.choice(available_speeds) for _ in range(len(self.route)-1)]
-        
-        # Gerar pontos de recarga (20% de chance por ponto)
-        self.recharges = [random.random() < 0.2 for _ in range(len(self.route)-1)]
-        
-        # Gerar horários de partida iniciais
-        self.departure_times = ['06:00:00']  # Começa às 6h
-        
-        self.evaluate()
-    
+        if rng is None:
+            rng = np.random.default_rng()
+        self._population.initialize_random(rng, slice(self._row, self._row + 1))
+
     def evaluate(self):
         """Avalia fitness do indivíduo"""
-        try:
-            self._calculate_metrics()
-            self._calculate_fitness()
-            self.is_valid = True
-        except Exception as e:
-            # print(f"Erro na avaliação: {e}")
-            self.fitness = 0.0001
-            self.is_valid = False
-    
-    def _calculate_metrics(self):
-        """Calcula métricas de custo e tempo"""
-        total_flight_time = 0
-        total_cost = 0
-        current_battery = self.drone.calculate_autonomy(self.speeds[0])
-        current_day = 1
-        current_time = self._time_to_seconds('06:00:00')
-        num_recharges = 0
-        
-        max_day_time = self._time_to_seconds('19:00:00')
-        late_penalty_time = self._time_to_seconds('17:00:00')
-        
-        for i in range(len(self.route) - 1):
-            start_cep = self.route[i]
-            end_cep = self.route[i + 1]
-            
-            # Calcular parâmetros de voo
-            start_time_str = self._seconds_to_time(current_time)
-            flight_params = self.route_calculator.calculate_flight_parameters(
-                start_cep, end_cep, self.speeds[i], self.weather, 
-                current_day, start_time_str
-            )
-            
-            # Tempo de voo
-            flight_time = self.drone.calculate_flight_time(
-                flight_params['distance_km'], 
-                flight_params['effective_speed_kmh']
-            )
-            
-            # Consumo de bateria
-            energy_consumption = self.drone.calculate_energy_consumption(
-                flight_params['distance_km'], 
-                self.speeds[i]
-            )
-            
-            # Verificar se precisa recarregar
-            needs_recharge = (energy_consumption + self.drone.stop_penalty > current_battery)
-            
-            if needs_recharge or self.recharges[i]:
-                # Pouso para recarga
-                num_recharges += 1
-                current_battery = self.drone.calculate_autonomy(self.speeds[i])
-                
-                # Custo adicional se após 17h
-                if current_time > late_penalty_time:
-                    total_cost += self.drone.recharge_cost
-                
-                # Tempo de parada para recarga
-                current_time += self.drone.stop_penalty
-                if current_time > max_day_time:
-                    current_day += 1
-                    if current_day > 7:
-                        raise ValueError("Prazo de 7 dias excedido")
-                    current_time = self._time_to_seconds('06:00:00')
-            
-            # Atualizar bateria e tempo
-            current_battery -= energy_consumption
-            if current_battery < 0:
-                raise ValueError("Bateria insuficiente")
-                
-            current_time += flight_time
-            total_flight_time += flight_time
-            
-            # Penalidade de parada para fotos
-            current_battery -= self.drone.stop_penalty
-            current_time += self.drone.stop_penalty
-            
-            if current_battery < 0:
-                raise ValueError("Bateria insuficiente após parada")
-            
-            # Verificar horário
-            if current_time > max_day_time:
-                current_day += 1
-                if current_day > 7:
-                    raise ValueError("Prazo de 7 dias excedido")
-                current_time = self._time_to_seconds('06:00:00')
-        
-        self.total_flight_time = total_flight_time
-        self.total_cost = total_cost + (total_flight_time / 3600) * 10  # R$10 por hora
-        self.num_recharges = num_recharges
-        self.days_used = current_day
-    
-    def _calculate_fitness(self):
-        """Calcula fitness baseado no custo total"""
-        # Fitness é inversamente proporcional ao custo
-        base_fitness = 1.0 / (1.0 + self.total_cost)
-        
-        # Bônus por usar menos dias
-        day_bonus = (8 - self.days_used) * 0.1
-        
-        # Bônus por menos recargas
-        recharge_bonus = (10 - self.num_recharges) * 0.05
-        
-        self.fitness = base_fitness * (1 + day_bonus + recharge_bonus)
-    
+        self._population.evaluate(slice(self._row, self._row + 1))
+
     def _time_to_seconds(self, time_str):
         """Converte string de tempo para segundos"""
         h, m, s = map(int, time_str.split(':'))
         return h * 3600 + m * 60 + s
-    
+
     def _seconds_to_time(self, seconds):
         """Converte segundos para string de tempo"""
         h = seconds // 3600
@@ -173,213 +324,411 @@ class GeneticAlgorithm:
         self.ceps = ceps
         self.drone = drone
         self.weather = weather
-        self.population = []
+        # Dados de pares compartilhados entre processos (handle criado pelo processo principal)
+        handle = config.get('shared_data_handle')
+        shared_data = SharedCepData.attach(handle) if handle is not None else None
+        self.evaluator = RouteEvaluator(ceps, drone, weather, config.get('start_state'), shared_data)
+        
+        # Gerador único da execução; 'seed' torna a execução reproduzível
+        self.seed_sequence = make_seed_sequence(config.get('seed'))
+        self.rng = np.random.default_rng(self.seed_sequence)
+        
+        # Decodificador opcional: o AG busca só a ordem da rota
+        self.decoder = None
+        if config.get('speed_decoder', False):
+            self.decoder = SpeedRechargeDecoder(self.evaluator, config.get('decoder_labels', 16))
+        
+        # Taxas atuais dos operadores (variam com a diversidade se 'adaptive_rates');
+        # só são exigidas ao executar run()
+        self.mutation_rate = config.get('mutation_rate')
+        self.crossover_rate = config.get('crossover_rate')
+        
+        self.population = None
         self.best_individual = None
         self.fitness_history = []
+        self.stats_history = []
+        self._collapsed_generations = 0
         
         self.initialize_population()
     
     def initialize_population(self):
         """Inicializa população com indivíduos aleatórios"""
-        self.population = []
-        for _ in range(self.config['population_size']):
-            individual = Individual(self.ceps, self.drone, self.weather)
-            self.population.append(individual)
+        self.population = Population(self.evaluator, self.config['population_size'])
+        self.population.initialize_random(self.rng)
+        if self.decoder is not None:
+            self._decode(self.population, np.arange(len(self.population)))
+            self.population.evaluate()
+        if self.config.get('repair', False):
+            self.repair(self.population, np.arange(len(self.population)))
         
         self.update_best_individual()
     
     def update_best_individual(self):
-        """Atualiza o melhor indivíduo da população"""
-        valid_individuals = [ind for ind in self.population if ind.is_valid]
-        if valid_individuals:
-            self.best_individual = max(valid_individuals, key=lambda x: x.fitness)
-        else:
-            # Se não há válidos, pega o primeiro e força reavaliação
-            self.best_individual = self.population[0]
-            self.best_individual.evaluate()
+        """Atualiza o melhor indivíduo encontrado (comparando só com a população atual)"""
+        fitness = self._valid_fitness()
+        row = int(np.argmax(fitness))
+        
+        if np.isneginf(fitness[row]):
+            # Se não há válidos, fica com o que menos viola as restrições
+            best = self.best_individual
+            row = int(np.argmin(self.population.violation))
+            if best is None or (not best.is_valid and self.population.violation[row] < best.violation):
+                self.best_individual = self.population[row].copy()
+            return
+        
+        best = self.best_individual
+        if best is None or not best.is_valid or fitness[row] > best.fitness:
+            self.best_individual = self.population[row].copy()
+    
+    def warm_start(self, route, speeds, recharges, fraction=0.5):
+        """Semeia a população com uma solução conhecida (ex.: o plano anterior)
+
+        A primeira linha recebe a solução exata e as seguintes, até a fração indicada
+        da população, variações dela com uma troca aleatória de CEPs; o resto continua aleatório.
+        """
+        population = self.population
+        count = max(1, int(len(population) * fraction))
+        rows = np.arange(count)
+        
+        population.routes[rows] = self.evaluator.route_to_indices(route)
+        population.set_speeds(rows, np.tile(speeds, (count, 1)))
+        population.set_recharges(rows, np.tile(recharges, (count, 1)))
+        self._swap_mutation(population, rows[1:])
+        if self.decoder is not None:
+            self._decode(population, rows[1:])
+        
+        population.evaluate(rows)
+        self.best_individual = None
+        self.update_best_individual()
+    
+    def _decode(self, population, rows):
+        """Substitui velocidades e recargas das linhas pela atribuição do decodificador"""
+        speed_idx, recharges = self.decoder.decode(population.routes[rows])
+        population.speed_idx[rows] = speed_idx
+        population.set_recharges(rows, recharges)
+    
+    def _decode_changed(self, population, rows):
+        """Decodifica só as linhas cujos genes mudaram desde a última avaliação
+
+        O decodificador é determinístico pela rota, então cópias intactas dos pais
+        já trazem a atribuição ótima.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        rows = rows[population.hash_genomes(rows) != population.genome_hash[rows]]
+        if len(rows):
+            self._decode(population, rows)
+    
+    def spawn_seeds(self, count):
+        """Sementes filhas independentes (para workers e ilhas)"""
+        return self.seed_sequence.spawn(count)
+    
+    def _valid_fitness(self):
+        """Fitness da população com -inf para indivíduos inválidos"""
+        return np.where(self.population.is_valid, self.population.fitness, -np.inf)
+    
+    def _elite_rows(self):
+        """Linhas dos melhores indivíduos válidos, em ordem decrescente de fitness"""
+        elitism_count = min(self.config['elitism_count'], len(self.population))
+        if elitism_count <= 0:
+            return np.empty(0, dtype=np.int64)
+        
+        fitness = self._valid_fitness()
+        num_valid = int(self.population.is_valid.sum())
+        if num_valid == 0:
+            return np.argsort(self.population.violation, kind='stable')[:elitism_count]
+        
+        elitism_count = min(elitism_count, num_valid)
+        rows = np.argpartition(-fitness, elitism_count - 1)[:elitism_count]
+        return rows[np.argsort(-fitness[rows], kind='stable')]
+    
+    def _tournament_rows(self, count):
+        """Seleção por torneio de vários pais com um único sorteio"""
+        size = len(self.population)
+        fitness = self._valid_fitness()
+        
+        contestants = self.rng.integers(0, size, size=(count, self.config['tournament_size']))
+        contestant_fitness = fitness[contestants]
+        winners = contestants[np.arange(count), np.argmax(contestant_fitness, axis=1)]
+        
+        # Torneio sem válidos: vence quem viola menos as restrições
+        no_valid = np.isneginf(contestant_fitness.max(axis=1))
+        least_violation = np.argmin(self.population.violation[contestants], axis=1)
+        winners[no_valid] = contestants[np.arange(count), least_violation][no_valid]
+        return winners
     
     def selection(self):
         """Seleção por torneio"""
-        tournament = random.sample(self.population, self.config['tournament_size'])
-        valid_tournament = [ind for ind in tournament if ind.is_valid]
-        
-        if valid_tournament:
-            return max(valid_tournament, key=lambda x: x.fitness)
-        else:
-            return random.choice(self.population)
+        return self.population[int(self._tournament_rows(1)[0])]
     
-    def crossover(self, parent1, parent2):
+    def crossover(self, parent1, parent2, evaluate=True):
         """Crossover OX (Order Crossover) para rotas"""
-        child1 = Individual(self.ceps, self.drone, self.weather)
-        child2 = Individual(self.ceps, self.drone, self.weather)
+        children = Population.stack([parent1, parent2])
+        self._crossover_batch(children, np.array([0]))
         
-        # Crossover para rota
-        route1, route2 = self._ox_crossover_robust(parent1.route, parent2.route)
-        child1.route = route1
-        child2.route = route2
+        if evaluate:
+            children.evaluate()
         
-        # Crossover uniforme para velocidades e recargas
-        child1.speeds = self._uniform_crossover(parent1.speeds, parent2.speeds)
-        child2.speeds = self._uniform_crossover(parent2.speeds, parent1.speeds)
+        return children[0], children[1]
+    
+    def _crossover_batch(self, children, pairs):
+        """Crossover em lote: as linhas 2k e 2k+1 de children (cópias dos pais) viram os filhos do par k"""
+        first = 2 * np.asarray(pairs, dtype=np.int64)
+        second = first + 1
+        if len(first) == 0:
+            return
         
-        child1.recharges = self._uniform_crossover_bool(parent1.recharges, parent2.recharges)
-        child2.recharges = self._uniform_crossover_bool(parent2.recharges, parent1.recharges)
+        routes1, routes2 = children.routes[first], children.routes[second]
+        children.routes[first], children.routes[second] = self._ox_crossover_batch(routes1, routes2)
         
-        child1.evaluate()
-        child2.evaluate()
+        # Crossover uniforme para velocidades e recargas
+        speeds1, speeds2 = children.speed_idx[first], children.speed_idx[second]
+        children.speed_idx[first] = self._uniform_crossover(speeds1, speeds2)
+        children.speed_idx[second] = self._uniform_crossover(speeds2, speeds1)
         
-        return child1, child2
+        bits1, bits2 = children.recharge_bits[first], children.recharge_bits[second]
+        children.recharge_bits[first] = self._uniform_crossover_bits(bits1, bits2)
+        children.recharge_bits[second] = self._uniform_crossover_bits(bits2, bits1)
     
-    def _ox_crossover_robust(self, route1, route2):
-        """Order Crossover robusto - versão corrigida"""
-        size = len(route1)
-        
-        # Garantir que as rotas são válidas
-        if not all(isinstance(point, dict) for point in route1 + route2):
-            return route1, route2  # Fallback para rotas originais
-        
-        # Escolher pontos de corte (excluindo primeiro e último que são unibrasil)
-        start, end = sorted(random.sample(range(1, size-1), 2))
-        
-        # Filho 1
-        child1 = [None] * size
-        child1[0] = route1[0]  # Unibrasil no início
-        child1[-1] = route1[-1]  # Unibrasil no final
-        
-        # Copiar segmento do parent1
-        child1[start:end+1] = route1[start:end+1]
-        
-        # Preencher restante com genes do parent2
-        parent2_pos = 0
-        for i in range(1, size-1):
-            if child1[i] is None:
-                # Encontrar próximo gene do parent2 que não está em child1
-                while parent2_pos < size:
-                    gene = route2[parent2_pos]
-                    parent2_pos += 1
-                    
-                    # Verificar se é um gene válido e não está na child1
-                    if (isinstance(gene, dict) and 
-                        gene.get('cep') != '82821020' and 
-                        gene not in child1):
-                        child1[i] = gene
-                        break
-        
-        # Filho 2 (processo similar)
-        child2 = [None] * size
-        child2[0] = route2[0]
-        child2[-1] = route2[-1]
-        child2[start:end+1] = route2[start:end+1]
-        
-        parent1_pos = 0
-        for i in range(1, size-1):
-            if child2[i] is None:
-                while parent1_pos < size:
-                    gene = route1[parent1_pos]
-                    parent1_pos += 1
-                    
-                    if (isinstance(gene, dict) and 
-                        gene.get('cep') != '82821020' and 
-                        gene not in child2):
-                        child2[i] = gene
-                        break
-        
-        # Garantir que não há None nas rotas finais
-        child1 = [gene if gene is not None else route1[i] for i, gene in enumerate(child1)]
-        child2 = [gene if gene is not None else route2[i] for i, gene in enumerate(child2)]
-        
+    def _ox_crossover_batch(self, routes1, routes2):
+        """Order Crossover vetorizado, mantendo o Unibrasil fixo nas pontas"""
+        count, size = routes1.shape
+        inner_size = size - 2
+        if inner_size < 2:
+            return routes1.copy(), routes2.copy()
+        
+        # Pontos de corte distintos (excluindo primeiro e último que são unibrasil)
+        cut1 = self.rng.integers(0, inner_size, size=count)
+        cut2 = self.rng.integers(0, inner_size - 1, size=count)
+        cut2 += cut2 >= cut1
+        start, end = np.minimum(cut1, cut2), np.maximum(cut1, cut2)
+        positions = np.arange(inner_size)
+        in_segment = (positions >= start[:, None]) & (positions <= end[:, None])
+        
+        inner1, inner2 = routes1[:, 1:-1], routes2[:, 1:-1]
+        child1, child2 = routes1.copy(), routes2.copy()
+        child1[:, 1:-1] = self._ox_fill(inner1, inner2, in_segment)
+        child2[:, 1:-1] = self._ox_fill(inner2, inner1, in_segment)
         return child1, child2
     
-    def _uniform_crossover(self, list1, list2):
-        """Crossover uniforme para listas numéricas"""
-        child = []
-        for i in range(len(list1)):
-            if random.random() < 0.5:
-                child.append(list1[i])
-            else:
-                child.append(list2[i])
-        return child
+    def _ox_fill(self, donor, filler, in_segment):
+        """Copia o segmento do doador e preenche o restante com os genes do outro pai, na ordem"""
+        count, inner_size = donor.shape
+        rows = np.arange(count)[:, None]
+        
+        # Posição de cada CEP no doador, para saber se o gene já está no segmento
+        position_in_donor = np.zeros((count, len(self.ceps)), dtype=np.int64)
+        position_in_donor[rows, donor] = np.arange(inner_size)
+        filler_in_segment = in_segment[rows, position_in_donor[rows, filler]]
+        
+        # Genes restantes (na ordem do outro pai) vão para as posições livres (em ordem)
+        fill_genes = np.take_along_axis(filler, np.argsort(filler_in_segment, axis=1, kind='stable'), axis=1)
+        free_positions = np.argsort(in_segment, axis=1, kind='stable')
+        child = np.empty_like(donor)
+        np.put_along_axis(child, free_positions, fill_genes, axis=1)
+        return np.where(in_segment, donor, child)
+    
+    def _uniform_crossover(self, genes1, genes2):
+        """Crossover uniforme para arrays de genes"""
+        mask = self.rng.random(genes1.shape) < 0.5
+        return np.where(mask, genes1, genes2)
     
-    def _uniform_crossover_bool(self, list1, list2):
-        """Crossover uniforme para listas booleanas"""
-        child = []
-        for i in range(len(list1)):
-            if random.random() < 0.5:
-                child.append(list1[i])
-            else:
-                child.append(list2[i])
-        return child
+    def _uniform_crossover_bits(self, bits1, bits2):
+        """Crossover uniforme para bits empacotados (uma máscara aleatória por byte)"""
+        mask = self.rng.integers(0, 256, size=bits1.shape, dtype=np.uint8)
+        return (bits1 & mask) | (bits2 & ~mask)
     
-    def mutation(self, individual):
+    def mutation(self, individual, evaluate=True):
         """Aplica mutações no indivíduo"""
-        mutated = deepcopy(individual)
+        mutated = individual.copy()
+        self._mutate_batch(mutated._population)
         
-        # Mutação de rota (swap) - apenas entre pontos que não são Unibrasil
-        if random.random() < self.config['mutation_rate']:
-            # Escolher índices que não são o primeiro nem último
-            available_indices = list(range(1, len(mutated.route)-1))
-            if len(available_indices) >= 2:
-                idx1, idx2 = random.sample(available_indices, 2)
-                mutated.route[idx1], mutated.route[idx2] = mutated.route[idx2], mutated.route[idx1]
+        if evaluate:
+            mutated.evaluate()
+        return mutated
+    
+    def _mutate_batch(self, population):
+        """Aplica as mutações em todas as linhas da população (no lugar)"""
+        count = len(population)
+        rate = self.mutation_rate
+        
+        # Mutação de rota (swap)
+        self._swap_mutation(population, np.flatnonzero(self.rng.random(count) < rate))
         
         # Mutação de velocidade
-        if random.random() < self.config['mutation_rate']:
-            idx = random.randint(0, len(mutated.speeds)-1)
-            available_speeds = self.drone.get_available_speeds()
-            mutated.speeds[idx] = random.choice(available_speeds)
+        rows = np.flatnonzero(self.rng.random(count) < rate)
+        idx = self.rng.integers(0, population.num_legs, size=len(rows))
+        population.speed_idx[rows, idx] = self.rng.integers(0, len(population.speed_values), size=len(rows))
         
         # Mutação de recarga
-        if random.random() < self.config['mutation_rate']:
-            idx = random.randint(0, len(mutated.recharges)-1)
-            mutated.recharges[idx] = not mutated.recharges[idx]
-        
-        mutated.evaluate()
-        return mutated
+        rows = np.flatnonzero(self.rng.random(count) < rate)
+        idx = self.rng.integers(0, population.num_legs, size=len(rows))
+        population.recharge_bits[rows, idx // 8] ^= (128 >> (idx % 8)).astype(np.uint8)
+    
+    def repair(self, population, rows):
+        """Repara no lugar as linhas inválidas, a partir da falha que a simulação encontrou
+
+        Bateria: o trecho não cabe na autonomia nem com pouso, então as velocidades
+        do trecho que falhou em diante descem até a maior que cabe em cada trecho.
+        Prazo: o atraso se acumula nos trechos já voados, então até o trecho que
+        falhou as recargas planejadas saem e as velocidades sobem um passo (sem
+        passar da maior que cabe); os trechos seguintes ficam como estão.
+        Cada tentativa só é mantida se reduzir a violação. Retorna o número de avaliações.
+        """
+        drone = self.drone
+        evaluations = 0
+        rows = np.asarray(rows, dtype=np.int64)
+        for _ in range(self.config.get('repair_attempts', 3)):
+            repairable = np.isin(population.fail_code[rows], (FAIL_DEADLINE, FAIL_BATTERY, FAIL_BATTERY_AFTER_STOP))
+            rows = rows[~population.is_valid[rows] & repairable]
+            if len(rows) == 0:
+                break
+            
+            # Maior índice de velocidade em que cada trecho cabe na autonomia (-1: nenhum)
+            distances, _ = self.evaluator.leg_geometry(population.routes[rows])
+            fits = (distances[..., None] * drone.seconds_per_km + drone.stop_penalty
+                    <= drone.autonomy_table)
+            max_speed = len(drone.speeds) - 1 - np.argmax(fits[..., ::-1], axis=-1)
+            max_speed = np.where(fits.any(axis=-1), max_speed, 0)
+            
+            # A regra violada vem da simulação (fail_code), não das velocidades
+            speed_idx = population.speed_idx[rows].astype(np.int64)
+            legs = np.arange(speed_idx.shape[1])
+            fail_leg = population.fail_leg[rows, None]
+            deadline = (population.fail_code[rows] == FAIL_DEADLINE)[:, None]
+            before_failure = deadline & (legs <= fail_leg)
+            after_failure = ~deadline & (legs >= fail_leg)
+            
+            speed_idx = np.where(before_failure, np.minimum(speed_idx + 1, max_speed), speed_idx)
+            speed_idx = np.where(after_failure, np.minimum(speed_idx, max_speed), speed_idx)
+            new_speed_idx = speed_idx.astype(np.uint8)
+            new_recharges = population.recharges(rows) & ~before_failure
+            
+            backup = population.take(rows)
+            population.speed_idx[rows] = new_speed_idx
+            population.set_recharges(rows, new_recharges)
+            population.evaluate(rows)
+            evaluations += len(rows)
+            
+            # Desfaz o que não reduziu a violação
+            worse = ~population.is_valid[rows] & (population.violation[rows] >= backup.violation)
+            for name in Population.ARRAYS:
+                getattr(population, name)[rows[worse]] = getattr(backup, name)[worse]
+            rows = rows[~worse]
+        return evaluations
+    
+    def _record_stats(self, generation, evaluations):
+        """Registra as estatísticas da geração e ajusta as taxas pela diversidade"""
+        population = self.population
+        unique_genomes = population.unique_genomes()
+        edge_entropy = population.edge_entropy()
+        valid_fitness = population.fitness[population.is_valid]
+        
+        self.stats_history.append({
+            'generation': generation,
+            'best_fitness': self.best_individual.fitness,
+            'mean_fitness': float(valid_fitness.mean()) if len(valid_fitness) else None,
+            'valid_count': int(population.is_valid.sum()),
+            'unique_genomes': unique_genomes,
+            'edge_entropy': edge_entropy,
+            'mutation_rate': self.mutation_rate,
+            'crossover_rate': self.crossover_rate,
+            'evaluations': evaluations,
+            'restarted': False,
+        })
+        
+        if self.config.get('adaptive_rates', False):
+            # Pressão 0 com diversidade suficiente, 1 com a população de clones
+            target = self.config.get('diversity_target', 0.5)
+            pressure = float(np.clip(1 - edge_entropy / target, 0.0, 1.0))
+            base_mutation, base_crossover = self.config['mutation_rate'], self.config['crossover_rate']
+            max_mutation = max(base_mutation, self.config.get('max_mutation_rate', 0.3))
+            self.mutation_rate = base_mutation + (max_mutation - base_mutation) * pressure
+            self.crossover_rate = base_crossover + (1 - base_crossover) * pressure
+    
+    def _restart_on_collapse(self, num_elites):
+        """Reinicia os não-elite quando a população fica colapsada e sem melhora por várias gerações
+
+        Colapso: fração de genomas distintos abaixo de 'restart_threshold'.
+        """
+        threshold = self.config.get('restart_threshold')
+        if threshold is None:
+            return False
+        
+        population = self.population
+        stats = self.stats_history[-1]
+        improved = len(self.fitness_history) > 1 and self.fitness_history[-1] > self.fitness_history[-2]
+        if improved or stats['unique_genomes'] / len(population) >= threshold:
+            self._collapsed_generations = 0
+            return False
+        self._collapsed_generations += 1
+        if self._collapsed_generations < self.config.get('restart_patience', 10):
+            return False
+        
+        # Reavaliações (e reparos) dos reiniciados entram nas avaliações da geração
+        rows = np.arange(num_elites, len(population))
+        population.initialize_random(self.rng, rows)
+        evaluations = len(rows)
+        if self.decoder is not None:
+            self._decode(population, rows)
+            population.evaluate(rows)
+            evaluations += len(rows)
+        if self.config.get('repair', False):
+            evaluations += self.repair(population, rows)
+        stats['evaluations'] += evaluations
+        self._collapsed_generations = 0
+        return True
+    
+    def _swap_mutation(self, population, rows):
+        """Troca dois CEPs de posição em cada linha - apenas entre pontos que não são as pontas"""
+        size = population.routes.shape[1]
+        if size - 2 < 2 or len(rows) == 0:
+            return
+        idx1 = self.rng.integers(1, size - 1, size=len(rows))
+        idx2 = self.rng.integers(1, size - 2, size=len(rows))
+        idx2 += idx2 >= idx1
+        genes1 = population.routes[rows, idx1]
+        population.routes[rows, idx1] = population.routes[rows, idx2]
+        population.routes[rows, idx2] = genes1
     
     def run(self):
         """Executa o algoritmo genético"""
         print(f"Executando AG por {self.config['generations']} gerações...")
         
         for generation in range(self.config['generations']):
-            new_population = []
-            
             # Elitismo - pegar os melhores indivíduos válidos
-            valid_individuals = [ind for ind in self.population if ind.is_valid]
-            if valid_individuals:
-                elite = sorted(valid_individuals, key=lambda x: x.fitness, reverse=True)[:self.config['elitism_count']]
-            else:
-                elite = self.population[:self.config['elitism_count']]
-            new_population.extend(elite)
+            elite_rows = self._elite_rows()
+            
+            # Preencher resto da população com pais sorteados de uma vez
+            num_children = self.config['population_size'] - len(elite_rows)
+            parent_rows = self._tournament_rows(num_children + num_children % 2)
+            children = self.population.take(parent_rows)
+            
+            do_crossover = self.rng.random(len(parent_rows) // 2) < self.crossover_rate
+            self._crossover_batch(children, np.flatnonzero(do_crossover))
+            self._mutate_batch(children)
             
-            # Preencher resto da população
-            while len(new_population) < self.config['population_size']:
-                parent1 = self.selection()
-                parent2 = self.selection()
-                
-                if random.random() < self.config['crossover_rate']:
-                    try:
-                        child1, child2 = self.crossover(parent1, parent2)
-                    except Exception as e:
-                        # Em caso de erro no crossover, usar os pais
-                        # print(f"Erro no crossover: {e}")  # Descomente para debug
-                        child1, child2 = parent1, parent2
-                else:
-                    child1, child2 = parent1, parent2
-                
-                child1 = self.mutation(child1)
-                child2 = self.mutation(child2)
-                
-                new_population.extend([child1, child2])
+            # Manter tamanho da população e avaliar de uma vez só os filhos que mudaram
+            # (cópias idênticas aos pais já trazem as métricas e a decodificação)
+            children = children.take(np.arange(num_children))
+            if self.decoder is not None:
+                self._decode_changed(children, np.arange(num_children))
+            changed = np.flatnonzero(children.hash_genomes() != children.genome_hash)
+            children.evaluate(changed)
+            evaluations = len(changed)
+            if self.config.get('repair', False):
+                evaluations += self.repair(children, changed)
+            self.population = Population.concatenate([self.population.take(elite_rows), children])
             
-            # Manter tamanho da população
-            self.population = new_population[:self.config['population_size']]
             self.update_best_individual()
             self.fitness_history.append(self.best_individual.fitness)
+            self._record_stats(generation, evaluations)
+            self.stats_history[-1]['restarted'] = self._restart_on_collapse(len(elite_rows))
             
             if generation % 100 == 0:
-                valid_count = sum(1 for ind in self.population if ind.is_valid)
+                stats = self.stats_history[-1]
                 print(f"Geração {generation}: Melhor fitness = {self.best_individual.fitness:.6f}, "
-                      f"Válidos: {valid_count}/{len(self.population)}")
+                      f"Válidos: {stats['valid_count']}/{len(self.population)}, "
+                      f"Genomas distintos: {stats['unique_genomes']}")
         
         print("Otimização concluída!")
         return self.best_individual, self.fitness_history
\ No newline at end of file
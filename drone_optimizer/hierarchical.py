@@ -0,0 +1,221 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from .genetic_algorithm import GeneticAlgorithm, Individual, DEPOT_CEP, make_seed_sequence
+from .route_evaluator import RouteEvaluator, EARTH_RADIUS_KM
+from .shared_data import SharedCepData, create_shared_data
+
+
+def kmeans_clusters(latitudes, longitudes, num_clusters, rng, iterations=20, chunk_size=8192):
+    """K-means em coordenadas planas (equiretangulares); retorna (rótulos, centros)"""
+    points = np.column_stack([latitudes, longitudes * np.cos(np.mean(latitudes))])
+    num_clusters = max(1, min(num_clusters, len(points)))
+    centers = points[rng.choice(len(points), size=num_clusters, replace=False)]
+    labels = np.zeros(len(points), dtype=np.int64)
+
+    for _ in range(iterations):
+        # Distâncias em blocos para não alocar n x k de uma vez
+        for start in range(0, len(points), chunk_size):
+            block = points[start:start + chunk_size]
+            distances = ((block[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+            labels[start:start + chunk_size] = np.argmin(distances, axis=1)
+
+        counts = np.bincount(labels, minlength=num_clusters)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, points)
+        moved = counts > 0
+        new_centers = centers.copy()
+        new_centers[moved] = sums[moved] / counts[moved, None]
+        if np.allclose(new_centers, centers):
+            break
+        centers = new_centers
+
+    # Remover clusters vazios e renumerar
+    used = np.unique(labels)
+    labels = np.searchsorted(used, labels)
+    return labels, centers[used]
+
+
+def _distance_matrix(latitudes, longitudes):
+    """Matriz de distâncias de Haversine (km) entre todos os pontos (em radianos)"""
+    dlat = latitudes[:, None] - latitudes[None, :]
+    dlon = longitudes[:, None] - longitudes[None, :]
+    a = (np.sin(dlat / 2) ** 2
+         + np.cos(latitudes)[:, None] * np.cos(latitudes)[None, :] * np.sin(dlon / 2) ** 2)
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(np.maximum(0.0, 1 - a)))
+
+
+def solve_open_path(distances, entry, exit, max_iterations=None):
+    """Caminho por todos os pontos de entry até exit: vizinho mais próximo + 2-opt
+
+    Retorna a ordem dos pontos (índices locais) começando em entry e terminando em exit.
+    """
+    size = len(distances)
+    if size == 1:
+        return [entry]
+
+    # Vizinho mais próximo, reservando o ponto de saída para o fim
+    visited = np.zeros(size, dtype=bool)
+    visited[[entry, exit]] = True
+    path = [entry]
+    for _ in range(size - 2):
+        candidates = np.where(visited, np.inf, distances[path[-1]])
+        nearest = int(np.argmin(candidates))
+        visited[nearest] = True
+        path.append(nearest)
+    path.append(exit)
+    path = np.array(path)
+
+    # 2-opt vetorizado: inverte o trecho path[i+1..j] mantendo as pontas fixas
+    if max_iterations is None:
+        max_iterations = 10 * size
+    upper = np.triu(np.ones((size - 1, size - 1), dtype=bool), k=1)
+    for _ in range(max_iterations):
+        starts, ends = path[:-1], path[1:]
+        edge = distances[starts, ends]
+        gain = (edge[:, None] + edge[None, :]
+                - distances[np.ix_(starts, starts)] - distances[np.ix_(ends, ends)])
+        gain = np.where(upper, gain, 0.0)
+        i, j = np.unravel_index(np.argmax(gain), gain.shape)
+        if gain[i, j] <= 1e-9:
+            break
+        path[i + 1:j + 1] = path[i + 1:j + 1][::-1]
+    return path.tolist()
+
+
+def _solve_cluster(args):
+    """Resolve o caminho interno de um cluster (função de topo para rodar em outro processo)
+
+    Recebe (latitudes, longitudes, entrada, saída) ou, com dados compartilhados,
+    (handle, índices dos CEPs, entrada, saída).
+    """
+    first, second, entry, exit = args
+    if isinstance(first, dict):
+        distances = SharedCepData.attach(first).cluster_distances(second)
+    else:
+        distances = _distance_matrix(first, second)
+    return solve_open_path(distances, entry, exit)
+
+
+class HierarchicalSolver:
+    """Cluster primeiro, rota depois: ordem dos clusters pelo AG e caminhos internos em paralelo"""
+
+    def __init__(self, config, ceps, drone, weather):
+        self.config = config
+        self.ceps = ceps
+        self.drone = drone
+        self.weather = weather
+        self.evaluator = RouteEvaluator(ceps, drone, weather)
+        self.seed_sequence = make_seed_sequence(config.get('seed'))
+
+    def run(self):
+        """Executa o solver e retorna um Individual com a rota completa"""
+        cluster_seed, ga_seed = self.seed_sequence.spawn(2)
+        depot = next((i for i, cep in enumerate(self.ceps) if cep['cep'] == DEPOT_CEP), 0)
+        others = np.array([i for i in range(len(self.ceps)) if i != depot], dtype=np.int64)
+        latitudes = self.evaluator.latitudes
+        longitudes = self.evaluator.longitudes
+
+        # 1) Agrupar CEPs
+        num_clusters = int(np.ceil(len(others) / self.config.get('cluster_size', 200)))
+        labels, _ = kmeans_clusters(latitudes[others], longitudes[others], num_clusters,
+                                    np.random.default_rng(cluster_seed))
+        members = [others[labels == k] for k in range(labels.max() + 1)]
+        print(f"{len(others)} CEPs agrupados em {len(members)} clusters")
+
+        # 2) Ordem dos clusters com o AG (centroides como pseudo-CEPs)
+        order = self._cluster_order(members, depot, ga_seed)
+
+        # 3) Caminhos internos em paralelo, ligando a saída de um cluster à entrada do próximo
+        tasks = self._cluster_tasks([members[k] for k in order], depot)
+        shared_data = create_shared_data(self.config, self.ceps) if self.config.get('shared_data') else None
+        try:
+            if shared_data is not None:
+                # Workers recebem só o handle e os índices; coordenadas e distâncias vêm da memória compartilhada
+                tasks = [(shared_data.handle, members[k], entry, exit)
+                         for k, (_, _, entry, exit) in zip(order, tasks)]
+            workers = self.config.get('workers')
+            if workers == 1 or len(tasks) == 1:
+                paths = [_solve_cluster(task) for task in tasks]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    paths = list(executor.map(_solve_cluster, tasks, chunksize=max(1, len(tasks) // 64)))
+        finally:
+            if shared_data is not None:
+                shared_data.close()
+
+        # 4) Costurar as rotas e escolher a velocidade de cruzeiro
+        route = [depot]
+        for k, path in zip(order, paths):
+            route.extend(members[k][path])
+        route.append(depot)
+        speeds, recharges = self._cruise_speeds(np.array(route))
+
+        return Individual.from_genes(self.ceps, self.drone, self.weather,
+                                     [self.ceps[i] for i in route], speeds, recharges)
+
+    def _cluster_order(self, members, depot, seed):
+        """Resolve a ordem de visita dos clusters com o AG existente"""
+        if len(members) <= 2:
+            return list(range(len(members)))
+
+        pseudo_ceps = [self.ceps[depot]]
+        for k, cluster in enumerate(members):
+            pseudo_ceps.append({
+                'cep': f'cluster_{k}',
+                'latitude': float(np.degrees(self.evaluator.latitudes[cluster].mean())),
+                'longitude': float(np.degrees(self.evaluator.longitudes[cluster].mean()))
+            })
+
+        ga_config = dict(self.config, seed=seed)
+        best_individual, _ = GeneticAlgorithm(ga_config, pseudo_ceps, self.drone, self.weather).run()
+        if best_individual.is_valid:
+            return [int(point['cep'].split('_')[1]) for point in best_individual.route[1:-1]]
+
+        # Sem ordem válida no AG: circuito pelos centroides (vizinho mais próximo + 2-opt)
+        print("AG sem solução válida para a ordem dos clusters; usando 2-opt nos centroides")
+        latitudes = np.radians([point['latitude'] for point in pseudo_ceps] + [pseudo_ceps[0]['latitude']])
+        longitudes = np.radians([point['longitude'] for point in pseudo_ceps] + [pseudo_ceps[0]['longitude']])
+        path = solve_open_path(_distance_matrix(latitudes, longitudes), 0, len(pseudo_ceps))
+        return [k - 1 for k in path[1:-1]]
+
+    def _cluster_tasks(self, ordered_members, depot):
+        """Define pontos de entrada e saída de cada cluster e monta as tarefas"""
+        latitudes = self.evaluator.latitudes
+        longitudes = self.evaluator.longitudes
+        centroids = [(latitudes[m].mean(), longitudes[m].mean()) for m in ordered_members]
+        centroids.append((latitudes[depot], longitudes[depot]))
+
+        tasks = []
+        previous_exit = depot
+        for k, cluster in enumerate(ordered_members):
+            lat, lon = latitudes[cluster], longitudes[cluster]
+
+            # Saída: ponto mais próximo do próximo cluster (ou do Unibrasil)
+            next_lat, next_lon = centroids[k + 1]
+            exit = int(np.argmin((lat - next_lat) ** 2 + ((lon - next_lon) * np.cos(lat)) ** 2))
+
+            # Entrada: ponto mais próximo da saída anterior, diferente da saída
+            entry_distance = ((lat - latitudes[previous_exit]) ** 2
+                              + ((lon - longitudes[previous_exit]) * np.cos(lat)) ** 2)
+            if len(cluster) > 1:
+                entry_distance[exit] = np.inf
+            entry = int(np.argmin(entry_distance))
+
+            tasks.append((lat, lon, entry, exit))
+            previous_exit = cluster[exit]
+        return tasks
+
+    def _cruise_speeds(self, route):
+        """Avalia a rota em todas as velocidades uniformes e fica com a de melhor fitness"""
+        available_speeds = self.drone.speeds
+        num_legs = len(route) - 1
+        speeds = np.repeat(available_speeds[:, None], num_legs, axis=1)
+        recharges = np.zeros((len(available_speeds), num_legs), dtype=bool)
+
+        result = self.evaluator.evaluate_batch(np.tile(route, (len(available_speeds), 1)), speeds, recharges)
+        score = np.where(result['is_valid'], result['fitness'], -np.inf)
+        if np.isneginf(score).all():
+            # Nenhuma é válida: a de menor violação
+            score = -result['violation']
+        best = int(np.argmax(score))
+        return speeds[best].tolist(), recharges[best].tolist()
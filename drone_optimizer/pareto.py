@@ -0,0 +1,143 @@
+import numpy as np
+from .genetic_algorithm import GeneticAlgorithm, Population
+
+# Objetivos minimizados no modo Pareto (colunas da população)
+OBJECTIVES = ('total_cost', 'days_used', 'num_recharges')
+
+
+def fast_non_dominated_sort(objectives):
+    """Frente de Pareto de cada linha (0 = não dominada), para objetivos minimizados (B, M)"""
+    objectives = np.asarray(objectives, dtype=np.float64)
+    less_equal = (objectives[:, None, :] <= objectives[None, :, :]).all(axis=2)
+    less = (objectives[:, None, :] < objectives[None, :, :]).any(axis=2)
+    dominates = less_equal & less  # dominates[i, j]: i domina j
+
+    ranks = np.full(len(objectives), -1, dtype=np.int64)
+    domination_count = dominates.sum(axis=0)
+    front = np.flatnonzero(domination_count == 0)
+    rank = 0
+    while len(front):
+        ranks[front] = rank
+        # Tira a frente atual e vê quem deixou de ser dominado
+        domination_count = domination_count - dominates[front].sum(axis=0)
+        domination_count[ranks >= 0] = -1
+        front = np.flatnonzero(domination_count == 0)
+        rank += 1
+    return ranks
+
+
+def crowding_distance(objectives, ranks):
+    """Distância de aglomeração de cada linha dentro da sua frente (pontas = infinito)"""
+    objectives = np.asarray(objectives, dtype=np.float64)
+    distance = np.zeros(len(objectives))
+    for rank in np.unique(ranks):
+        members = np.flatnonzero(ranks == rank)
+        if len(members) <= 2:
+            distance[members] = np.inf
+            continue
+        values = objectives[members]
+        order = np.argsort(values, axis=0, kind='stable')
+        sorted_values = np.take_along_axis(values, order, axis=0)
+        span = sorted_values[-1] - sorted_values[0]
+        gaps = np.zeros_like(values)
+        gaps[1:-1] = (sorted_values[2:] - sorted_values[:-2]) / np.where(span > 0, span, 1.0)
+        gaps[[0, -1]] = np.inf
+        contribution = np.zeros_like(values)
+        np.put_along_axis(contribution, order, gaps, axis=0)
+        distance[members] = contribution.sum(axis=1)
+    return distance
+
+
+class ParetoGeneticAlgorithm(GeneticAlgorithm):
+    """NSGA-II sobre custo, dias utilizados e recargas, com os operadores do AG
+
+    Em vez de uma fitness escalar, cada geração ordena pais e filhos por frente de
+    Pareto e distância de aglomeração; run() retorna a frente inteira para o
+    planejador escolher o compromisso.
+    """
+
+    def __init__(self, config, ceps, drone, weather):
+        super().__init__(config, ceps, drone, weather)
+        self.pareto_front = []
+        self.front_history = []
+
+    def objectives(self, population):
+        """Matriz (B, 3) de objetivos; inválidos ficam atrás de todos os válidos"""
+        values = np.column_stack([getattr(population, name) for name in OBJECTIVES]).astype(np.float64)
+        return np.where(population.is_valid[:, None], values, np.inf)
+
+    def rank_population(self, population):
+        """(frente, distância de aglomeração) de cada linha"""
+        objectives = self.objectives(population)
+        valid = population.is_valid
+        ranks = np.zeros(len(population), dtype=np.int64)
+        crowding = np.zeros(len(population))
+        if valid.any():
+            ranks[valid] = fast_non_dominated_sort(objectives[valid])
+            crowding[valid] = crowding_distance(objectives[valid], ranks[valid])
+        # Dominância com restrições: inválidos atrás dos válidos, ordenados pela violação
+        first_invalid = ranks[valid].max() + 1 if valid.any() else 0
+        violation_rank = np.unique(population.violation[~valid], return_inverse=True)[1]
+        ranks[~valid] = first_invalid + violation_rank.ravel()
+        return ranks, crowding
+
+    def _crowded_tournament_rows(self, count, ranks, crowding):
+        """Torneio pelo operador de comparação do NSGA-II (menor frente, depois maior aglomeração)"""
+        contestants = self.rng.integers(0, len(ranks), size=(count, self.config['tournament_size']))
+        order = np.lexsort((-crowding[contestants], ranks[contestants]), axis=-1)
+        return contestants[np.arange(count), order[:, 0]]
+
+    def _survivors(self, population, size):
+        """Seleção (mu + lambda): melhores por frente e aglomeração, genomas repetidos por último"""
+        ranks, crowding = self.rank_population(population)
+        duplicate = np.ones(len(population), dtype=bool)
+        duplicate[np.unique(population.genome_hash, return_index=True)[1]] = False
+        order = np.lexsort((-crowding, ranks, duplicate))[:size]
+        return population.take(order)
+
+    def run(self):
+        """Executa o NSGA-II e retorna (frente de Pareto como lista de Individual, histórico do tamanho da frente)"""
+        print(f"Executando NSGA-II por {self.config['generations']} gerações...")
+        size = self.config['population_size']
+        ranks, crowding = self.rank_population(self.population)
+
+        for generation in range(self.config['generations']):
+            parent_rows = self._crowded_tournament_rows(size + size % 2, ranks, crowding)
+            children = self.population.take(parent_rows)
+
+            do_crossover = self.rng.random(len(parent_rows) // 2) < self.crossover_rate
+            self._crossover_batch(children, np.flatnonzero(do_crossover))
+            self._mutate_batch(children)
+
+            children = children.take(np.arange(size))
+            if self.decoder is not None:
+                self._decode_changed(children, np.arange(size))
+            changed = np.flatnonzero(children.hash_genomes() != children.genome_hash)
+            children.evaluate(changed)
+            if self.config.get('repair', False):
+                self.repair(children, changed)
+
+            self.population = self._survivors(Population.concatenate([self.population, children]), size)
+            ranks, crowding = self.rank_population(self.population)
+            self.update_best_individual()
+            self.fitness_history.append(self.best_individual.fitness)
+
+            front_size = int(((ranks == 0) & self.population.is_valid).sum())
+            self.front_history.append(front_size)
+            if generation % 100 == 0:
+                print(f"Geração {generation}: Frente de Pareto com {front_size} soluções, "
+                      f"Válidos: {int(self.population.is_valid.sum())}/{len(self.population)}")
+
+        self.pareto_front = self._front(ranks)
+        print(f"Otimização concluída! {len(self.pareto_front)} soluções na frente de Pareto")
+        return self.pareto_front, self.front_history
+
+    def _front(self, ranks):
+        """Soluções válidas não dominadas, sem objetivos repetidos, em ordem de custo"""
+        population = self.population
+        rows = np.flatnonzero((ranks == 0) & population.is_valid)
+        _, first = np.unique(self.objectives(population)[rows], axis=0, return_index=True)
+        rows = rows[first]
+        rows = rows[np.argsort(population.total_cost[rows], kind='stable')]
+        front = population.take(rows)
+        return [front[i] for i in range(len(front))]
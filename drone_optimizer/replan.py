@@ -0,0 +1,94 @@
+import pandas as pd
+from .genetic_algorithm import GeneticAlgorithm
+from .route_evaluator import RouteEvaluator, DAY_START, MAX_DAY_TIME, load_route, evaluate_route
+
+
+def _time_to_seconds(time_str):
+    h, m, s = map(int, time_str.split(':'))
+    return h * 3600 + m * 60 + s
+
+
+def executed_state(file_path, executed_legs, drone, weather):
+    """Estado do drone depois dos primeiros executed_legs trechos de um plano exportado
+
+    Dia e hora vêm do próprio plano (o que de fato aconteceu); a bateria é recalculada
+    pelo avaliador, já que o consumo depende só da velocidade e não do vento.
+    Retorna (start_state, rota restante, velocidades restantes, recargas restantes).
+    """
+    route, speeds, recharges = load_route(file_path)
+    num_legs = len(route) - 1
+    if not 0 < executed_legs < num_legs:
+        raise ValueError(f"Trechos executados devem estar entre 1 e {num_legs - 1}")
+
+    prefix = evaluate_route(route[:executed_legs + 1], speeds[:executed_legs], recharges[:executed_legs],
+                            drone, weather)
+    if prefix['fail_leg'] is not None and prefix['fail_leg'] < executed_legs - 1:
+        raise ValueError(f"Trecho executado {prefix['fail_leg']} inválido: {prefix['error']}")
+
+    last = pd.read_csv(file_path).iloc[executed_legs - 1]
+    day, current_time = int(last['Dia_do_voo']), _time_to_seconds(last['Hora_final'])
+    if current_time > MAX_DAY_TIME:
+        day, current_time = day + 1, DAY_START
+
+    start_state = {
+        'cep': route[executed_legs]['cep'],
+        'day': day,
+        'time': float(current_time),
+        'battery': float(prefix['legs'][executed_legs - 1]['battery']),
+    }
+    return (start_state, route[executed_legs:], speeds[executed_legs:], recharges[executed_legs:])
+
+
+class RollingReplanner:
+    """Replaneja só o restante de um plano em execução (ex.: quando chega nova previsão)
+
+    O prefixo executado fica fixo; o AG otimiza o sufixo a partir do estado atual do
+    drone, com a população semeada pelo plano anterior.
+    """
+
+    def __init__(self, config, drone, weather):
+        self.config = config
+        self.drone = drone
+        self.weather = weather
+
+    def run(self, file_path, executed_legs):
+        """Retorna (melhor sufixo como Individual, histórico de fitness)"""
+        start_state, route, speeds, recharges = executed_state(file_path, executed_legs,
+                                                               self.drone, self.weather)
+
+        route, speeds, recharges = _drop_revisits(route, speeds, recharges)
+
+        # Unibrasil primeiro (fallback de depósito do AG), depois o CEP atual e os restantes
+        ceps = [route[-1]] + route[:-1]
+        print(f"Replanejando {len(route) - 1} trechos a partir do CEP {start_state['cep']} "
+              f"(dia {start_state['day']})")
+
+        ga_config = dict(self.config, start_state=start_state,
+                         generations=self.config.get('replan_generations', self.config['generations']))
+        ga = GeneticAlgorithm(ga_config, ceps, self.drone, self.weather)
+        ga.warm_start(route, speeds, recharges, self.config.get('warm_start_fraction', 0.5))
+
+        previous = RouteEvaluator(ceps, self.drone, self.weather, start_state).evaluate(
+            route, speeds, recharges, legs=False)
+        best_individual, fitness_history = ga.run()
+        if previous['is_valid']:
+            print(f"Custo do restante: R$ {previous['total_cost']:.2f} (plano anterior) -> "
+                  f"R$ {best_individual.total_cost:.2f} (replanejado)")
+        return best_individual, fitness_history
+
+
+def _drop_revisits(route, speeds, recharges):
+    """Remove visitas repetidas a um CEP (fica a primeira); os trechos vizinhos viram um só"""
+    route, speeds, recharges = list(route), list(speeds), list(recharges)
+    seen = {route[-1]['cep']}
+    p = 0
+    while p < len(route) - 1:
+        if route[p]['cep'] in seen and p > 0:
+            route.pop(p)
+            speeds.pop(p)
+            merged = recharges.pop(p)
+            recharges[p - 1] = recharges[p - 1] or merged
+            continue
+        seen.add(route[p]['cep'])
+        p += 1
+    return route, speeds, recharges
@@ -57,7 +57,13 @@ class RouteCalculator:
             end_coord['latitude'], end_coord['longitude']
         )
         
-        wind_speed, wind_direction = weather.get_wind_for_time(day, start_time)
+        # Previsão espacial: vento na célula onde o trecho começa (como no RouteEvaluator)
+        if hasattr(weather, 'cell_of'):
+            wind_speed, wind_direction = weather.get_wind_for_time(
+                day, start_time, start_coord['latitude'], start_coord['longitude']
+            )
+        else:
+            wind_speed, wind_direction = weather.get_wind_for_time(day, start_time)
         effective_speed = weather.calculate_effective_speed(
             air_speed, bearing, wind_speed, wind_direction
         )
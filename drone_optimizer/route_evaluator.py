@@ -0,0 +1,387 @@
+import numpy as np
+import pandas as pd
+
+# Regras de simulação da rota (bateria, jornada diária e custo)
+DAY_START = 6 * 3600        # 06:00:00
+LATE_PENALTY_TIME = 17 * 3600  # 17:00:00
+MAX_DAY_TIME = 19 * 3600    # 19:00:00
+MAX_DAYS = 7
+COST_PER_HOUR = 10.0
+INVALID_FITNESS = 0.0001
+EARTH_RADIUS_KM = 6371.0
+
+# Resolução da tabela de vento para previsões sem grade própria: o horário é
+# arredondado para a hora mais próxima (minuto >= 30 sobe), logo basta meia hora
+SLOT_SECONDS = 1800
+MAX_WIND_HOUR = 48
+
+# Códigos de falha da simulação
+FAIL_NONE = 0
+FAIL_DEADLINE = 1
+FAIL_BATTERY = 2
+FAIL_BATTERY_AFTER_STOP = 3
+FAIL_SPEED = 4
+
+FAIL_MESSAGES = {
+    FAIL_NONE: None,
+    FAIL_DEADLINE: "Prazo de 7 dias excedido",
+    FAIL_BATTERY: "Bateria insuficiente",
+    FAIL_BATTERY_AFTER_STOP: "Bateria insuficiente após parada",
+    FAIL_SPEED: "Velocidade não disponível para o drone",
+}
+
+
+def compute_violation(num_legs, fail_leg, deficit):
+    """Tamanho da violação de uma rota inválida: trechos não concluídos mais o déficit de bateria
+
+    deficit é a fração da autonomia que faltou no trecho que falhou (0 se a falha não foi de bateria).
+    """
+    return (num_legs - fail_leg) + deficit
+
+
+def invalid_fitness(violation):
+    """Fitness de rotas inválidas: abaixo de INVALID_FITNESS e decrescente com a violação"""
+    return INVALID_FITNESS / (1.0 + violation)
+
+
+def compute_fitness(total_cost, days_used, num_recharges):
+    """Fitness inversamente proporcional ao custo, com bônus por dias e recargas"""
+    base_fitness = 1.0 / (1.0 + total_cost)
+    day_bonus = (8 - days_used) * 0.1
+    recharge_bonus = (10 - num_recharges) * 0.05
+    return base_fitness * (1 + day_bonus + recharge_bonus)
+
+
+def _compile_wind_table(weather):
+    """Grades densas (dia x horário x célula) de velocidade e ângulo do vento e a resolução em segundos
+
+    Usa as grades já compiladas pela previsão quando existem; caso contrário
+    consulta get_wind_for_time a cada meia hora (uma única célula).
+    """
+    if hasattr(weather, 'wind_speed_grid'):
+        return weather.wind_speed_grid, weather.wind_angle_grid, weather.resolution_seconds
+
+    num_slots = 2 * MAX_WIND_HOUR
+    speeds = np.zeros((MAX_DAYS + 1, num_slots + 1, 1))
+    angles = np.zeros((MAX_DAYS + 1, num_slots + 1, 1))
+    for day in range(MAX_DAYS + 1):
+        for slot in range(num_slots + 1):
+            seconds = slot * SLOT_SECONDS
+            wind_speed, wind_direction = weather.get_wind_for_time(
+                day, f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:00")
+            speeds[day, slot, 0] = wind_speed
+            angles[day, slot, 0] = np.radians(weather.direction_angles[wind_direction])
+    return speeds, angles, SLOT_SECONDS
+
+
+class RouteEvaluator:
+    """Avalia rotas (índices de CEPs) em lote, sem passar pelo algoritmo genético
+
+    start_state (opcional) define onde e quando as rotas começam, para replanejar
+    uma campanha em andamento: {'cep', 'day', 'time' (segundos), 'battery' (segundos)}.
+    Sem ele, as rotas partem no dia 1 às 06:00 com a bateria cheia na velocidade do
+    primeiro trecho. shared_data (SharedCepData, opcional) fornece distâncias e
+    azimutes pré-calculados em vez de calculá-los a cada avaliação.
+    """
+
+    def __init__(self, ceps, drone, weather, start_state=None, shared_data=None):
+        self.ceps = ceps
+        self.drone = drone
+        self.weather = weather
+        self.start_state = start_state
+        self.shared_data = shared_data
+        if shared_data is not None:
+            self.shared_rows = shared_data.rows_for(ceps)
+
+        self.latitudes = np.radians([cep['latitude'] for cep in ceps])
+        self.longitudes = np.radians([cep['longitude'] for cep in ceps])
+        self.cep_index = {cep['cep']: i for i, cep in enumerate(ceps)}
+
+        self.wind_speed_table, self.wind_angle_table, self.wind_resolution = _compile_wind_table(weather)
+        self.last_wind_slot = self.wind_speed_table.shape[1] - 1
+        self.last_wind_day = self.wind_speed_table.shape[0] - 1
+
+        # Célula espacial da previsão em que cada CEP está
+        if hasattr(weather, 'cell_of'):
+            self.cells = weather.cell_of(np.degrees(self.latitudes), np.degrees(self.longitudes))
+        else:
+            self.cells = np.zeros(len(ceps), dtype=np.int64)
+
+    def route_to_indices(self, route):
+        """Converte uma rota de dicionários para índices de CEPs"""
+        return np.array([self.cep_index[point['cep']] for point in route], dtype=np.int64)
+
+    def leg_geometry(self, routes):
+        """Distância (km) e azimute (rad) de cada trecho das rotas"""
+        if self.shared_data is not None:
+            rows = self.shared_rows[routes]
+            return self.shared_data.pair_geometry(rows[:, :-1], rows[:, 1:])
+
+        lat1 = self.latitudes[routes[:, :-1]]
+        lat2 = self.latitudes[routes[:, 1:]]
+        dlon = self.longitudes[routes[:, 1:]] - self.longitudes[routes[:, :-1]]
+        dlat = lat2 - lat1
+
+        a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+        distances = EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+        x = np.sin(dlon) * np.cos(lat2)
+        y = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)
+        bearings = np.arctan2(x, y)
+        return distances, bearings
+
+    def evaluate_batch(self, routes, speeds, recharges, record_legs=False):
+        """Simula várias rotas em paralelo (um passo por trecho) e retorna as métricas
+
+        routes: (B, L+1) índices de CEPs; speeds: (B, L) km/h; recharges: (B, L) bool.
+        """
+        routes = np.atleast_2d(np.asarray(routes))
+        speeds = np.atleast_2d(np.asarray(speeds, dtype=np.float64))
+        recharges = np.atleast_2d(np.asarray(recharges, dtype=bool))
+        batch, num_legs = speeds.shape
+
+        distances, bearings = self.leg_geometry(routes)
+        sin_bearing = np.sin(bearings)
+        cos_bearing = np.cos(bearings)
+        cells = self.cells[routes[:, :-1]]
+
+        # Consumo e autonomia vêm das tabelas do drone (por índice de velocidade)
+        drone_speeds = self.drone.speeds
+        speed_idx = np.clip(self.drone.speed_index(speeds).astype(np.int64), 0, len(drone_speeds) - 1)
+        speed_ok = drone_speeds[speed_idx] == speeds
+        energies = distances * self.drone.seconds_per_km[speed_idx]
+        autonomies = self.drone.autonomy_table[speed_idx]
+
+        start_battery, start_day, start_time = self.initial_state()
+        battery = autonomies[:, 0].copy() if start_battery is None else np.full(batch, start_battery)
+        day = np.full(batch, start_day, dtype=np.int64)
+        current_time = np.full(batch, start_time)
+        total_flight_time = np.zeros(batch)
+        late_cost = np.zeros(batch)
+        num_recharges = np.zeros(batch, dtype=np.int64)
+        fail_code = np.where(speed_ok.all(axis=1), FAIL_NONE, FAIL_SPEED)
+        fail_leg = np.where(speed_ok.all(axis=1), -1, np.argmin(speed_ok, axis=1))
+        deficit = np.zeros(batch)
+
+        if record_legs:
+            legs = {key: np.zeros((batch, num_legs)) for key in (
+                'day', 'start_time', 'effective_speed_kmh', 'wind_speed_kmh',
+                'flight_time', 'energy', 'battery', 'end_time')}
+            legs['recharge'] = np.zeros((batch, num_legs), dtype=bool)
+
+        for leg in range(num_legs):
+            active = fail_code == FAIL_NONE
+            if not active.any():
+                break
+
+            step = self.simulate_leg(
+                battery, day, current_time, distances[:, leg], sin_bearing[:, leg], cos_bearing[:, leg],
+                speeds[:, leg], energies[:, leg], autonomies[:, leg], recharges[:, leg], cells[:, leg]
+            )
+
+            if record_legs:
+                legs['day'][:, leg] = day
+                legs['start_time'][:, leg] = current_time
+                for key in ('effective_speed_kmh', 'wind_speed_kmh', 'flight_time', 'battery'):
+                    legs[key][:, leg] = step[key]
+                legs['energy'][:, leg] = energies[:, leg]
+                legs['recharge'][:, leg] = step['recharge']
+                legs['end_time'][:, leg] = step['time']
+
+            failed = active & (step['fail_code'] != FAIL_NONE)
+            fail_code[failed] = step['fail_code'][failed]
+            fail_leg[failed] = leg
+            deficit[failed] = np.clip(-step['battery'] / autonomies[:, leg], 0.0, 1.0)[failed]
+
+            ok = active & ~failed
+            battery = np.where(ok, step['battery'], battery)
+            day = np.where(ok, step['day'], day)
+            current_time = np.where(ok, step['time'], current_time)
+            total_flight_time += np.where(ok, step['flight_time'], 0.0)
+            late_cost += np.where(ok, step['late_cost'], 0.0)
+            num_recharges += ok & step['recharge']
+
+        total_cost = late_cost + (total_flight_time / 3600) * COST_PER_HOUR
+        is_valid = fail_code == FAIL_NONE
+        violation = np.where(is_valid, 0.0, compute_violation(num_legs, fail_leg, deficit))
+        fitness = np.where(is_valid, compute_fitness(total_cost, day, num_recharges), invalid_fitness(violation))
+
+        result = {
+            'fitness': fitness,
+            'total_cost': total_cost,
+            'total_flight_time': total_flight_time,
+            'num_recharges': num_recharges,
+            'days_used': day,
+            'is_valid': is_valid,
+            'fail_code': fail_code,
+            'fail_leg': fail_leg,
+            'violation': violation,
+        }
+        if record_legs:
+            legs['distance_km'] = distances
+            legs['bearing_degrees'] = (np.degrees(bearings) + 360) % 360
+            result['legs'] = legs
+        return result
+
+    def initial_state(self):
+        """(bateria ou None para bateria cheia, dia, hora em segundos) no início das rotas"""
+        start = self.start_state or {}
+        battery = start.get('battery')
+        return (None if battery is None else float(battery),
+                int(start.get('day', 1)), float(start.get('time', DAY_START)))
+
+    def simulate_leg(self, battery, day, current_time, distance, sin_bearing, cos_bearing,
+                     air_speed, energy, autonomy, planned_recharge, cell=0):
+        """Simula um trecho para arrays de estados (com broadcasting) e retorna o novo estado
+
+        cell é a célula da previsão no ponto de partida do trecho.
+        fail_code indica a primeira regra violada no trecho (FAIL_NONE se nenhuma).
+        """
+        stop_penalty = self.drone.stop_penalty
+        fail_code = np.zeros(np.broadcast(battery, air_speed, planned_recharge).shape, dtype=np.int64)
+
+        # Vento no horário de partida do trecho
+        slot = np.minimum((current_time // self.wind_resolution).astype(np.int64), self.last_wind_slot)
+        wind_day = np.minimum(day, self.last_wind_day)  # estados que já falharam podem passar do prazo
+        wind_speed = self.wind_speed_table[wind_day, slot, cell]
+        wind_angle = self.wind_angle_table[wind_day, slot, cell]
+
+        effective_x = air_speed * sin_bearing + wind_speed * np.sin(wind_angle)
+        effective_y = air_speed * cos_bearing + wind_speed * np.cos(wind_angle)
+        effective_speed = np.maximum(0.1, np.sqrt(effective_x ** 2 + effective_y ** 2))
+        flight_time = distance / effective_speed * 3600
+
+        # Pouso para recarga (obrigatório ou planejado)
+        recharge = (energy + stop_penalty > battery) | planned_recharge
+        battery = np.where(recharge, autonomy, battery)
+        late_cost = np.where(recharge & (current_time > LATE_PENALTY_TIME), self.drone.recharge_cost, 0.0)
+        current_time = np.where(recharge, current_time + stop_penalty, current_time)
+        overflow = recharge & (current_time > MAX_DAY_TIME)
+        day = day + overflow
+        current_time = np.where(overflow, float(DAY_START), current_time)
+        fail_code = np.where((fail_code == FAIL_NONE) & overflow & (day > MAX_DAYS), FAIL_DEADLINE, fail_code)
+
+        # Voo até o próximo CEP
+        battery = battery - energy
+        fail_code = np.where((fail_code == FAIL_NONE) & (battery < 0), FAIL_BATTERY, fail_code)
+        current_time = current_time + flight_time
+
+        # Penalidade de parada para fotos
+        battery = battery - stop_penalty
+        current_time = current_time + stop_penalty
+        fail_code = np.where((fail_code == FAIL_NONE) & (battery < 0), FAIL_BATTERY_AFTER_STOP, fail_code)
+
+        overflow = current_time > MAX_DAY_TIME
+        day = day + overflow
+        current_time = np.where(overflow, float(DAY_START), current_time)
+        fail_code = np.where((fail_code == FAIL_NONE) & overflow & (day > MAX_DAYS), FAIL_DEADLINE, fail_code)
+
+        return {
+            'battery': battery,
+            'day': day,
+            'time': current_time,
+            'flight_time': flight_time,
+            'late_cost': late_cost,
+            'recharge': recharge,
+            'fail_code': fail_code,
+            'effective_speed_kmh': effective_speed,
+            'wind_speed_kmh': wind_speed,
+        }
+
+    def evaluate(self, route, speeds, recharges, legs=True):
+        """Avalia uma única rota (lista de dicionários) com detalhamento por trecho"""
+        route_idx = self.route_to_indices(route)
+        batch = self.evaluate_batch(route_idx[np.newaxis], [speeds], [recharges], record_legs=legs)
+
+        fail_code = int(batch['fail_code'][0])
+        result = {
+            'fitness': float(batch['fitness'][0]),
+            'total_cost': float(batch['total_cost'][0]),
+            'total_flight_time': float(batch['total_flight_time'][0]),
+            'num_recharges': int(batch['num_recharges'][0]),
+            'days_used': int(batch['days_used'][0]),
+            'is_valid': bool(batch['is_valid'][0]),
+            'error': FAIL_MESSAGES[fail_code],
+            'violation': float(batch['violation'][0]),
+            'fail_leg': int(batch['fail_leg'][0]) if fail_code != FAIL_NONE else None,
+        }
+        if legs:
+            result['legs'] = self._leg_records(route, speeds, batch['legs'], result['fail_leg'])
+        return result
+
+    def _leg_records(self, route, speeds, legs, fail_leg):
+        """Monta o detalhamento de cada trecho simulado"""
+        num_legs = len(route) - 1 if fail_leg is None else fail_leg + 1
+        records = []
+        for i in range(num_legs):
+            records.append({
+                'cep_inicial': route[i]['cep'],
+                'cep_final': route[i + 1]['cep'],
+                'dia': int(legs['day'][0, i]),
+                'hora_inicial': _seconds_to_time(legs['start_time'][0, i]),
+                'velocidade': speeds[i],
+                'distance_km': legs['distance_km'][0, i],
+                'bearing_degrees': legs['bearing_degrees'][0, i],
+                'wind_speed_kmh': legs['wind_speed_kmh'][0, i],
+                'effective_speed_kmh': legs['effective_speed_kmh'][0, i],
+                'flight_time': legs['flight_time'][0, i],
+                'energy': legs['energy'][0, i],
+                'pouso': bool(legs['recharge'][0, i]),
+                'battery': legs['battery'][0, i],
+                'hora_final': _seconds_to_time(legs['end_time'][0, i]),
+            })
+        return records
+
+
+def _seconds_to_time(seconds):
+    """Converte segundos para string de tempo"""
+    h = seconds // 3600
+    m = (seconds % 3600) // 60
+    s = seconds % 60
+    return f"{int(h):02d}:{int(m):02d}:{int(s):02d}"
+
+
+def _normalize_cep(value):
+    """Remove o sufixo '.0' que o pandas adiciona a CEPs lidos como float"""
+    value = str(value)
+    return value[:-2] if value.endswith('.0') else value
+
+
+def load_route(file_path):
+    """Carrega uma rota exportada (formato de best_solution.csv)
+
+    Retorna (route, speeds, recharges), com a rota como lista de dicionários.
+    """
+    df = pd.read_csv(file_path, dtype={'CEP_inicial': str, 'CEP_final': str})
+    if df.empty:
+        raise ValueError(f"Rota vazia em {file_path}")
+
+    route = []
+    for _, row in df.iterrows():
+        route.append({
+            'cep': _normalize_cep(row['CEP_inicial']),
+            'latitude': float(row['Latitude_inicial']),
+            'longitude': float(row['Longitude_inicial'])
+        })
+    last = df.iloc[-1]
+    end_cep = _normalize_cep(last['CEP_final'])
+    if end_cep == route[0]['cep']:
+        route.append(route[0])
+    else:
+        route.append({
+            'cep': end_cep,
+            'latitude': float(last['Latitude_final']),
+            'longitude': float(last['Longitude_final'])
+        })
+
+    speeds = [int(speed) for speed in df['Velocidade']]
+    recharges = [pouso == 'SIM' for pouso in df['Pouso']]
+    return route, speeds, recharges
+
+
+def evaluate_route(route, speeds, recharges, drone, weather, legs=True):
+    """Avalia uma rota externa com as mesmas regras de bateria, dias e custo do AG"""
+    # CEPs únicos da própria rota (o Unibrasil aparece no início e no fim)
+    ceps = list({point['cep']: point for point in route}.values())
+    evaluator = RouteEvaluator(ceps, drone, weather)
+    return evaluator.evaluate(route, speeds, recharges, legs=legs)
@@ -0,0 +1,195 @@
+import os
+import tempfile
+import numpy as np
+from multiprocessing import shared_memory
+from .route_evaluator import EARTH_RADIUS_KM
+
+# Segmentos/arquivos já abertos neste processo (mantidos vivos enquanto houver views)
+_attached = {}
+
+
+def _haversine(lat1, lon1, lat2, lon2):
+    """Distância (km) e azimute (rad) entre pontos em radianos, com broadcasting"""
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    distances = EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(np.maximum(0.0, 1 - a)))
+    x = np.sin(dlon) * np.cos(lat2)
+    y = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)
+    return distances, np.arctan2(x, y)
+
+
+class SharedCepData:
+    """Tabela de CEPs e dados de pares em memória compartilhada ou arquivos .npy mapeados
+
+    O processo principal cria os arrays uma vez (create); os workers recebem só o
+    handle (um dicionário pequeno) e anexam os mesmos dados sem cópia (attach).
+
+    pair_data:
+        'dense' - matrizes n x n de distância (km) e azimute (rad)
+        None    - só as coordenadas; os pares são calculados sob demanda
+    """
+
+    def __init__(self, handle, arrays, owner=False):
+        self.handle = handle
+        self.arrays = arrays
+        self.owner = owner
+        self.cep_codes = arrays['cep_codes']
+        self.latitudes = arrays['latitudes']
+        self.longitudes = arrays['longitudes']
+        self.distances = arrays.get('distances')
+        self.bearings = arrays.get('bearings')
+        self.index = {cep: i for i, cep in enumerate(self.cep_codes.tolist())}
+        self._lat_rad = np.radians(self.latitudes)
+        self._lon_rad = np.radians(self.longitudes)
+
+    @classmethod
+    def create(cls, ceps, pair_data='dense', dtype=np.float64, backend='shared_memory',
+               directory=None, chunk_size=1024):
+        """Cria os arrays compartilhados a partir da lista de CEPs
+
+        Os códigos de CEP mantêm o tipo de origem (texto ou número, como lidos do CSV).
+        """
+        n = len(ceps)
+        dtype = np.dtype(dtype)
+        shapes = {
+            'cep_codes': ((n,), np.array([cep['cep'] for cep in ceps]).dtype),
+            'latitudes': ((n,), np.dtype(np.float64)),
+            'longitudes': ((n,), np.dtype(np.float64)),
+        }
+        if pair_data == 'dense':
+            shapes['distances'] = ((n, n), dtype)
+            shapes['bearings'] = ((n, n), dtype)
+        elif pair_data is not None:
+            raise ValueError(f"Modo de dados de pares desconhecido: {pair_data}")
+
+        if backend == 'memmap' and directory is None:
+            directory = tempfile.mkdtemp(prefix='drone_ceps_')
+        handle = {'backend': backend, 'pair_data': pair_data, 'directory': directory, 'arrays': {}}
+        arrays = {}
+        for name, (shape, array_dtype) in shapes.items():
+            arrays[name] = _allocate(handle, name, shape, array_dtype)
+
+        arrays['cep_codes'][:] = [cep['cep'] for cep in ceps]
+        arrays['latitudes'][:] = [cep['latitude'] for cep in ceps]
+        arrays['longitudes'][:] = [cep['longitude'] for cep in ceps]
+
+        data = cls(handle, arrays, owner=True)
+        if pair_data is not None:
+            data._fill_pairs(chunk_size)
+        return data
+
+    @classmethod
+    def attach(cls, handle):
+        """Anexa (sem cópia) os arrays de um handle criado em outro processo"""
+        arrays = {}
+        for name, spec in handle['arrays'].items():
+            key = (handle['backend'], spec['location'])
+            if key not in _attached:
+                if handle['backend'] == 'memmap':
+                    _attached[key] = (None, np.load(spec['location'], mmap_mode='r'))
+                else:
+                    segment = shared_memory.SharedMemory(name=spec['location'])
+                    view = np.ndarray(spec['shape'], dtype=np.dtype(spec['dtype']), buffer=segment.buf)
+                    _attached[key] = (segment, view)
+            arrays[name] = _attached[key][1]
+        return cls(handle, arrays)
+
+    def _fill_pairs(self, chunk_size):
+        """Calcula as distâncias e azimutes por blocos de linhas (sem matriz temporária n x n)"""
+        lat, lon = self._lat_rad, self._lon_rad
+        for start in range(0, len(lat), chunk_size):
+            rows = slice(start, start + chunk_size)
+            distances, bearings = _haversine(lat[rows, None], lon[rows, None], lat[None, :], lon[None, :])
+            self.distances[rows] = distances
+            self.bearings[rows] = bearings
+
+    def __reduce__(self):
+        # Ao ir para outro processo, só o handle é serializado
+        return (SharedCepData.attach, (self.handle,))
+
+    def ceps(self, indices=None):
+        """CEPs (como dicionários) das linhas indicadas"""
+        if indices is None:
+            indices = range(len(self.cep_codes))
+        return [{'cep': self.cep_codes[i].item(), 'latitude': float(self.latitudes[i]),
+                 'longitude': float(self.longitudes[i])} for i in indices]
+
+    def rows_for(self, ceps):
+        """Linha de cada CEP da lista nos arrays compartilhados"""
+        return np.array([self.index[cep['cep']] for cep in ceps], dtype=np.int64)
+
+    def pair_geometry(self, starts, ends):
+        """Distância (km) e azimute (rad) entre linhas; sem matrizes, calculados na hora"""
+        if self.handle['pair_data'] == 'dense':
+            return (self.distances[starts, ends].astype(np.float64),
+                    self.bearings[starts, ends].astype(np.float64))
+
+        lat, lon = self._lat_rad, self._lon_rad
+        return _haversine(lat[starts], lon[starts], lat[ends], lon[ends])
+
+    def cluster_distances(self, rows):
+        """Matriz de distâncias (km) entre as linhas indicadas"""
+        rows = np.asarray(rows)
+        if self.handle['pair_data'] == 'dense':
+            return self.distances[np.ix_(rows, rows)].astype(np.float64)
+        lat, lon = self._lat_rad[rows], self._lon_rad[rows]
+        return _haversine(lat[:, None], lon[:, None], lat[None, :], lon[None, :])[0]
+
+    def close(self):
+        """Libera os recursos; o processo que criou os dados também os remove"""
+        self.arrays = {}
+        self.distances = self.bearings = None
+        if not self.owner:
+            return
+        for spec in self.handle['arrays'].values():
+            segment, _ = _attached.pop((self.handle['backend'], spec['location']), (None, None))
+            if segment is not None:
+                segment.unlink()
+                try:
+                    segment.close()
+                except BufferError:
+                    pass  # Ainda há views (ex.: indivíduos retornados); o mapeamento some com elas
+            elif self.handle['backend'] == 'memmap' and os.path.exists(spec['location']):
+                os.remove(spec['location'])
+        if self.handle['backend'] == 'memmap' and not os.listdir(self.handle['directory']):
+            os.rmdir(self.handle['directory'])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _allocate(handle, name, shape, dtype):
+    """Aloca um array compartilhado e registra sua localização no handle"""
+    if handle['backend'] == 'memmap':
+        location = os.path.join(handle['directory'], f'{name}.npy')
+        array = np.lib.format.open_memmap(location, mode='w+', dtype=dtype, shape=shape)
+        segment = None
+    elif handle['backend'] == 'shared_memory':
+        segment = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * dtype.itemsize))
+        location = segment.name
+        array = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+    else:
+        raise ValueError(f"Backend desconhecido: {handle['backend']}")
+
+    handle['arrays'][name] = {'location': location, 'shape': shape, 'dtype': dtype.str}
+    _attached[(handle['backend'], location)] = (segment, array)
+    return array
+
+
+def create_shared_data(config, ceps):
+    """SharedCepData conforme o config ('pair_data', 'pair_dtype', 'shared_backend')
+
+    pair_data 'auto' usa matrizes densas até 'dense_limit' CEPs e só as coordenadas
+    acima disso (pares calculados sob demanda, sem tabela O(n²)).
+    """
+    pair_data = config.get('pair_data', 'auto')
+    if pair_data == 'auto':
+        pair_data = 'dense' if len(ceps) <= config.get('dense_limit', 5000) else None
+    return SharedCepData.create(
+        ceps, pair_data=pair_data, dtype=config.get('pair_dtype', 'float64'),
+        backend=config.get('shared_backend', 'shared_memory')
+    )
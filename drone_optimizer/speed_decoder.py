@@ -0,0 +1,144 @@
+import numpy as np
+from .route_evaluator import (DAY_START, MAX_DAY_TIME, COST_PER_HOUR, FAIL_NONE,
+                              compute_fitness)
+
+
+class SpeedRechargeDecoder:
+    """Atribui velocidades e recargas para rotas fixas por programação dinâmica com rótulos limitados
+
+    A cada trecho, cada rótulo (estado de bateria, dia, hora e custo) é expandido com todas as
+    velocidades disponíveis, com e sem recarga planejada, usando as mesmas regras do avaliador.
+    Por rota fica só o melhor rótulo de cada faixa de bateria, o que limita a busca a
+    num_labels estados por trecho.
+    """
+
+    def __init__(self, evaluator, num_labels=16):
+        self.evaluator = evaluator
+        self.drone = evaluator.drone
+        self.num_labels = num_labels
+        self.max_autonomy = self.drone.autonomy_table.max()
+
+    def decode(self, routes):
+        """Retorna (índices de velocidade, recargas planejadas) para cada rota (B, L+1)"""
+        routes = np.atleast_2d(np.asarray(routes))
+        batch = len(routes)
+        num_speeds = len(self.drone.speeds)
+        width = max(self.num_labels, num_speeds)
+
+        distances, bearings = self.evaluator.leg_geometry(routes)
+        num_legs = distances.shape[1]
+        sin_bearing, cos_bearing = np.sin(bearings), np.cos(bearings)
+        cells = self.evaluator.cells[routes[:, :-1]]
+        recharge_weight, day_weight = self._weights(distances)
+
+        # Rótulos iniciais: um por velocidade do primeiro trecho (a bateria cheia depende dela)
+        start_battery, start_day, start_time = self.evaluator.initial_state()
+        battery = np.full((batch, width), -np.inf)
+        battery[:, :num_speeds] = self.drone.autonomy_table if start_battery is None else start_battery
+        day = np.full((batch, width), start_day, dtype=np.int64)
+        current_time = np.full((batch, width), start_time)
+        cost = np.zeros((batch, width))
+        num_recharges = np.zeros((batch, width), dtype=np.int64)
+        alive = np.zeros((batch, width), dtype=bool)
+        alive[:, :num_speeds] = True
+        first_speed = np.full(width, -1)
+        first_speed[:num_speeds] = np.arange(num_speeds)
+
+        parent = np.zeros((num_legs, batch, width), dtype=np.int32)
+        speed_choice = np.zeros((num_legs, batch, width), dtype=np.uint8)
+        recharge_choice = np.zeros((num_legs, batch, width), dtype=bool)
+        feasible = np.ones(batch, dtype=bool)
+
+        # Eixos dos candidatos: (rota, rótulo, velocidade, recarga planejada)
+        speeds = self.drone.speeds[None, None, :, None].astype(np.float64)
+        seconds_per_km = self.drone.seconds_per_km[None, None, :, None]
+        autonomy = self.drone.autonomy_table[None, None, :, None]
+        planned = np.array([False, True])[None, None, None, :]
+        rows = np.arange(batch)[:, None, None, None]
+        speed_ids = np.arange(num_speeds)[None, None, :, None]
+        shape = (batch, width, num_speeds, 2)
+
+        for leg in range(num_legs):
+            distance = distances[:, leg, None, None, None]
+            step = self.evaluator.simulate_leg(
+                battery[:, :, None, None], day[:, :, None, None], current_time[:, :, None, None],
+                distance, sin_bearing[:, leg, None, None, None], cos_bearing[:, leg, None, None, None],
+                speeds, distance * seconds_per_km, autonomy, planned, cells[:, leg, None, None, None]
+            )
+
+            valid = alive[:, :, None, None] & (step['fail_code'] == FAIL_NONE)
+            if leg == 0:
+                valid &= first_speed[None, :, None, None] == speed_ids
+            valid = np.broadcast_to(valid, shape)
+
+            new_cost = cost[:, :, None, None] + step['late_cost'] + step['flight_time'] / 3600 * COST_PER_HOUR
+            new_recharges = num_recharges[:, :, None, None] + step['recharge']
+            elapsed_days = (step['day'] - 1) + (step['time'] - DAY_START) / (MAX_DAY_TIME - DAY_START)
+            score = (new_cost + recharge_weight[:, None, None, None] * new_recharges
+                     + day_weight[:, None, None, None] * elapsed_days)
+
+            # Faixa de bateria de cada candidato: fica o de menor score por (rota, faixa)
+            bucket = np.clip((step['battery'] / self.max_autonomy * self.num_labels).astype(np.int64),
+                             0, self.num_labels - 1)
+            key = np.broadcast_to(rows * width + bucket, shape)[valid]
+            order = np.lexsort((np.broadcast_to(score, shape)[valid], key))
+            key = key[order]
+            first = np.ones(len(key), dtype=bool)
+            first[1:] = key[1:] != key[:-1]
+            chosen = np.flatnonzero(valid.ravel())[order[first]]
+            route_idx, label_idx, speed_idx, recharge_idx = np.unravel_index(chosen, shape)
+            slot = key[first] % width
+
+            def pick(values):
+                return np.broadcast_to(values, shape)[route_idx, label_idx, speed_idx, recharge_idx]
+
+            new_battery = np.full((batch, width), -np.inf)
+            new_day = np.ones((batch, width), dtype=np.int64)
+            new_time = np.full((batch, width), float(DAY_START))
+            next_cost = np.zeros((batch, width))
+            next_recharges = np.zeros((batch, width), dtype=np.int64)
+            alive = np.zeros((batch, width), dtype=bool)
+
+            new_battery[route_idx, slot] = pick(step['battery'])
+            new_day[route_idx, slot] = pick(step['day'])
+            new_time[route_idx, slot] = pick(step['time'])
+            next_cost[route_idx, slot] = pick(new_cost)
+            next_recharges[route_idx, slot] = pick(new_recharges)
+            alive[route_idx, slot] = True
+            parent[leg, route_idx, slot] = label_idx
+            speed_choice[leg, route_idx, slot] = speed_idx
+            recharge_choice[leg, route_idx, slot] = recharge_idx.astype(bool)
+
+            # Rotas sem nenhum rótulo viável ficam com a atribuição padrão
+            feasible &= alive.any(axis=1)
+
+            battery, day, current_time = new_battery, new_day, new_time
+            cost, num_recharges = next_cost, next_recharges
+
+        # Melhor rótulo final pela fitness real
+        fitness = np.where(alive, compute_fitness(cost, day, num_recharges), -np.inf)
+        slot = np.argmax(fitness, axis=1)
+
+        speed_idx = np.zeros((batch, num_legs), dtype=np.uint8)
+        recharges = np.zeros((batch, num_legs), dtype=bool)
+        rows = np.arange(batch)
+        for leg in range(num_legs - 1, -1, -1):
+            speed_idx[:, leg] = speed_choice[leg, rows, slot]
+            recharges[:, leg] = recharge_choice[leg, rows, slot]
+            slot = parent[leg, rows, slot]
+
+        # Sem atribuição viável: velocidade mínima (maior autonomia) e sem recargas planejadas
+        speed_idx[~feasible] = 0
+        recharges[~feasible] = False
+        return speed_idx, recharges
+
+    def _weights(self, distances):
+        """Custo equivalente de uma recarga e de um dia, pela derivada da fitness
+
+        Estima o custo da rota pela distância a uma velocidade média e usa
+        d(fitness)/d(recargas) e d(fitness)/d(dias) relativos a d(fitness)/d(custo).
+        """
+        mean_speed = self.drone.speeds.mean()
+        estimated_cost = distances.sum(axis=1) / mean_speed * COST_PER_HOUR
+        multiplier = 1 + (8 - 1) * 0.1 + 10 * 0.05
+        return 0.05 * (1 + estimated_cost) / multiplier, 0.1 * (1 + estimated_cost) / multiplier
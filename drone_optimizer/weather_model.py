@@ -1,85 +1,247 @@
 import math
+import numpy as np
+import pandas as pd
+
+DEFAULT_WIND_DATA = {
+    1: {
+        '06h': (17, 'ENE'), '09h': (18, 'E'), '12h': (19, 'E'),
+        '15h': (19, 'E'), '18h': (20, 'E'), '21h': (20, 'E')
+    },
+    2: {
+        '06h': (20, 'E'), '09h': (19, 'E'), '12h': (16, 'E'),
+        '15h': (19, 'E'), '18h': (21, 'E'), '21h': (21, 'E')
+    },
+    3: {
+        '06h': (15, 'ENE'), '09h': (17, 'NE'), '12h': (8, 'NE'),
+        '15h': (20, 'E'), '18h': (16, 'E'), '21h': (15, 'ENE')
+    },
+    4: {
+        '06h': (8, 'ENE'), '09h': (11, 'ENE'), '12h': (7, 'NE'),
+        '15h': (6, 'NE'), '18h': (11, 'E'), '21h': (11, 'E')
+    },
+    5: {
+        '06h': (3, 'WSW'), '09h': (3, 'WSW'), '12h': (7, 'WSW'),
+        '15h': (7, 'SSW'), '18h': (10, 'E'), '21h': (11, 'ENE')
+    },
+    6: {
+        '06h': (4, 'NE'), '09h': (5, 'ENE'), '12h': (4, 'NE'),
+        '15h': (8, 'E'), '18h': (15, 'E'), '21h': (15, 'E')
+    },
+    7: {
+        '06h': (5, 'NE'), '09h': (6, 'ENE'), '12h': (5, 'NE'),
+        '15h': (9, 'E'), '18h': (16, 'E'), '21h': (16, 'E')
+    }
+}
+
+DIRECTION_ANGLES = {
+    'N': 0, 'NNE': 22.5, 'NE': 45, 'ENE': 67.5,
+    'E': 90, 'ESE': 112.5, 'SE': 135, 'SSE': 157.5,
+    'S': 180, 'SSW': 202.5, 'SW': 225, 'WSW': 247.5,
+    'W': 270, 'WNW': 292.5, 'NW': 315, 'NNW': 337.5
+}
+
+MIN_FORECAST_DAYS = 7
+GRID_HOURS = 48  # horizonte da grade em cada dia (horários além disso usam o vento padrão)
+
 
 class WeatherForecast:
-    def __init__(self):
-        self.wind_data = {
-            1: {
-                '06h': (17, 'ENE'), '09h': (18, 'E'), '12h': (19, 'E'),
-                '15h': (19, 'E'), '18h': (20, 'E'), '21h': (20, 'E')
-            },
-            2: {
-                '06h': (20, 'E'), '09h': (19, 'E'), '12h': (16, 'E'),
-                '15h': (19, 'E'), '18h': (21, 'E'), '21h': (21, 'E')
-            },
-            3: {
-                '06h': (15, 'ENE'), '09h': (17, 'NE'), '12h': (8, 'NE'),
-                '15h': (20, 'E'), '18h': (16, 'E'), '21h': (15, 'ENE')
-            },
-            4: {
-                '06h': (8, 'ENE'), '09h': (11, 'ENE'), '12h': (7, 'NE'),
-                '15h': (6, 'NE'), '18h': (11, 'E'), '21h': (11, 'E')
-            },
-            5: {
-                '06h': (3, 'WSW'), '09h': (3, 'WSW'), '12h': (7, 'WSW'),
-                '15h': (7, 'SSW'), '18h': (10, 'E'), '21h': (11, 'ENE')
-            },
-            6: {
-                '06h': (4, 'NE'), '09h': (5, 'ENE'), '12h': (4, 'NE'),
-                '15h': (8, 'E'), '18h': (15, 'E'), '21h': (15, 'E')
-            },
-            7: {
-                '06h': (5, 'NE'), '09h': (6, 'ENE'), '12h': (5, 'NE'),
-                '15h': (9, 'E'), '18h': (16, 'E'), '21h': (16, 'E')
-            }
-        }
-        
-        self.direction_angles = {
-            'N': 0, 'NNE': 22.5, 'NE': 45, 'ENE': 67.5,
-            'E': 90, 'ESE': 112.5, 'SE': 135, 'SSE': 157.5,
-            'S': 180, 'SSW': 202.5, 'SW': 225, 'WSW': 247.5,
-            'W': 270, 'WNW': 292.5, 'NW': 315, 'NNW': 337.5
-        }
-    
-    def get_wind_for_time(self, day, hour_minute):
-        hour_str = self._get_time_slot(hour_minute)
-        
-        if day not in self.wind_data or hour_str not in self.wind_data[day]:
-            return (15, 'E')  # 15 km/h, Leste
-        
-        return self.wind_data[day][hour_str]
-    
-    def _get_time_slot(self, hour_minute):
-        hour = hour_minute.split(':')[0]
-        minute = int(hour_minute.split(':')[1])
-        
-        if minute < 30:
-            return f"{hour}h"
-        else:
-            next_hour = int(hour) + 1
-            return f"{next_hour:02d}h"
-    
+    """Previsão de vento compilada em grades densas (dia x horário x célula espacial)
+
+    A grade tem uma linha extra (dia 0) e uma coluna final de horário com o vento
+    padrão, de modo que qualquer consulta é um acesso direto a array.
+    """
+
+    def __init__(self, wind_data=None, default_wind=(15, 'E'), resolution_minutes=30):
+        self.direction_angles = dict(DIRECTION_ANGLES)
+        self._angle_names = {float(angle): name for name, angle in DIRECTION_ANGLES.items()}
+        self.wind_data = DEFAULT_WIND_DATA if wind_data is None else wind_data
+
+        # Horário arredondado para a hora mais próxima (minuto >= 30 sobe)
+        days = sorted(self.wind_data)
+        hours = sorted({int(slot[:-1]) for day in days for slot in self.wind_data[day]})
+        speed = np.full((len(days), len(hours)), np.nan)
+        direction = np.full((len(days), len(hours)), np.nan)
+        for i, day in enumerate(days):
+            for slot, (wind_speed, wind_direction) in self.wind_data[day].items():
+                j = hours.index(int(slot[:-1]))
+                speed[i, j] = wind_speed
+                direction[i, j] = self._direction_degrees(wind_direction)
+
+        self._build_grid(days, hours, speed[:, :, None], direction[:, :, None],
+                         default_wind, resolution_minutes, interpolate=False)
+        self.cell_latitudes = None
+        self.cell_longitudes = None
+
+    @classmethod
+    def from_arrays(cls, days, hours, wind_speed, wind_direction, cell_latitudes=None,
+                    cell_longitudes=None, interpolate=False, default_wind=(15, 'E'),
+                    resolution_minutes=30):
+        """Previsão a partir de arrays [dia, hora(, célula)] de velocidade (km/h) e direção (graus ou cardeal)"""
+        forecast = cls.__new__(cls)
+        forecast.direction_angles = dict(DIRECTION_ANGLES)
+        forecast._angle_names = {float(angle): name for name, angle in DIRECTION_ANGLES.items()}
+        forecast.wind_data = None
+
+        speed = np.asarray(wind_speed, dtype=np.float64)
+        direction = np.vectorize(forecast._direction_degrees, otypes=[np.float64])(wind_direction)
+        if speed.ndim == 2:
+            speed, direction = speed[:, :, None], direction[:, :, None]
+
+        forecast._build_grid(list(days), list(hours), speed, direction,
+                             default_wind, resolution_minutes, interpolate)
+        forecast.cell_latitudes = None if cell_latitudes is None else np.asarray(cell_latitudes, dtype=np.float64)
+        forecast.cell_longitudes = None if cell_longitudes is None else np.asarray(cell_longitudes, dtype=np.float64)
+        return forecast
+
+    def _build_grid(self, days, hours, speed, direction, default_wind, resolution_minutes, interpolate):
+        """Compila os dados em grades (dia, horário, célula) com o vento padrão nas bordas"""
+        if 1800 % (resolution_minutes * 60) != 0:
+            raise ValueError("A resolução deve dividir 30 minutos")
+
+        default_speed, default_direction = default_wind
+        default_angle = math.radians(self._direction_degrees(default_direction))
+        self.resolution_seconds = resolution_minutes * 60
+
+        num_days = max(max(days), MIN_FORECAST_DAYS) + 1
+        num_slots = GRID_HOURS * 3600 // self.resolution_seconds
+        num_cells = speed.shape[2]
+        self.wind_speed_grid = np.full((num_days, num_slots + 1, num_cells), float(default_speed))
+        self.wind_angle_grid = np.full((num_days, num_slots + 1, num_cells), default_angle)
+
+        slot_times = np.arange(num_slots) * self.resolution_seconds
+        hours = np.asarray(hours, dtype=np.float64)
+        for i, day in enumerate(days):
+            # Cada célula usa só os horários que tem; lacunas ficam com o vento padrão
+            for cell in range(num_cells):
+                known = ~np.isnan(speed[i, :, cell])
+                if not known.any():
+                    continue
+                cell_hours = hours[known]
+                cell_speed = speed[i, known, cell]
+                cell_angle = np.radians(direction[i, known, cell])
+
+                if interpolate:
+                    # Linear no tempo: velocidade escalar e direção pelo vetor unitário
+                    t = slot_times / 3600
+                    self.wind_speed_grid[day, :num_slots, cell] = np.interp(t, cell_hours, cell_speed)
+                    sin_angle = np.interp(t, cell_hours, np.sin(cell_angle))
+                    cos_angle = np.interp(t, cell_hours, np.cos(cell_angle))
+                    self.wind_angle_grid[day, :num_slots, cell] = np.arctan2(sin_angle, cos_angle) % (2 * np.pi)
+                else:
+                    # Horário mais próximo, se estiver a menos de meia hora (em horas cheias,
+                    # arredonda para a hora mais próxima); fora disso fica o vento padrão
+                    offsets = slot_times[:, None] - cell_hours[None, :] * 3600
+                    in_window = (offsets >= -1800) & (offsets < 1800)
+                    nearest = np.argmin(np.where(in_window, np.abs(offsets), np.inf), axis=1)
+                    slots = np.flatnonzero(in_window.any(axis=1))
+                    self.wind_speed_grid[day, slots, cell] = cell_speed[nearest[slots]]
+                    self.wind_angle_grid[day, slots, cell] = cell_angle[nearest[slots]]
+
+    def _direction_degrees(self, direction):
+        """Direção em graus a partir de um nome cardeal ou de um número"""
+        if isinstance(direction, str):
+            return float(self.direction_angles[direction])
+        return float(direction)
+
+    def cell_of(self, latitudes, longitudes):
+        """Célula espacial (centro mais próximo) de cada coordenada"""
+        latitudes = np.atleast_1d(np.asarray(latitudes, dtype=np.float64))
+        longitudes = np.atleast_1d(np.asarray(longitudes, dtype=np.float64))
+        if self.cell_latitudes is None:
+            return np.zeros(len(latitudes), dtype=np.int64)
+        distances = ((latitudes[:, None] - self.cell_latitudes[None, :]) ** 2
+                     + (longitudes[:, None] - self.cell_longitudes[None, :]) ** 2)
+        return np.argmin(distances, axis=1)
+
+    def slot_index(self, seconds):
+        """Índice de horário na grade para segundos desde 00:00 (vetorizável)"""
+        last_slot = self.wind_speed_grid.shape[1] - 1
+        return np.minimum((np.asarray(seconds) // self.resolution_seconds).astype(np.int64), last_slot)
+
+    def get_wind_for_time(self, day, hour_minute, latitude=None, longitude=None):
+        h, m = hour_minute.split(':')[:2]
+        slot = self.slot_index(int(h) * 3600 + int(m) * 60)
+        cell = 0 if latitude is None else int(self.cell_of(latitude, longitude)[0])
+
+        if not 0 < day < self.wind_speed_grid.shape[0]:
+            day = 0
+        wind_speed = float(self.wind_speed_grid[day, slot, cell])
+        degrees = round(math.degrees(self.wind_angle_grid[day, slot, cell]), 9)
+        wind_speed = int(wind_speed) if wind_speed.is_integer() else wind_speed
+        return (wind_speed, self._angle_names.get(degrees, degrees))
+
     def calculate_effective_speed(self, air_speed, flight_direction, wind_speed, wind_direction):
         """Calcula velocidade efetiva considerando vento"""
         flight_angle_rad = math.radians(flight_direction)
-        wind_angle_rad = math.radians(self.direction_angles[wind_direction])
-        
+        wind_angle_rad = math.radians(self._direction_degrees(wind_direction))
+
         # Componentes da velocidade do drone
         drone_x = air_speed * math.sin(flight_angle_rad)
         drone_y = air_speed * math.cos(flight_angle_rad)
-        
+
         # Componentes do vento
         wind_x = wind_speed * math.sin(wind_angle_rad)
         wind_y = wind_speed * math.cos(wind_angle_rad)
-        
+
         # Velocidade efetiva (solo)
         effective_x = drone_x + wind_x
         effective_y = drone_y + wind_y
-        
+
         # Magnitude da velocidade efetiva
         effective_speed = math.sqrt(effective_x**2 + effective_y**2)
-        
+
         return max(0.1, effective_speed)  # Evitar divisão por zero
-    
+
     def get_wind_angle(self, direction_str):
         """Retorna ângulo em graus para uma direção cardinal"""
-        return self.direction_angles.get(direction_str, 90)  # Default: Leste
\ No newline at end of file
+        return self.direction_angles.get(direction_str, 90)  # Default: Leste
+
+
+def load_forecast(file_path, interpolate=False, resolution_minutes=30):
+    """Carrega uma previsão de vento de arquivo CSV ou .npz
+
+    CSV: colunas day, hour (inteiro ou HH:MM), wind_speed, wind_direction (graus ou cardeal)
+    e, opcionalmente, latitude/longitude do centro da célula espacial.
+    .npz: arrays days, hours, wind_speed e wind_direction ([dia, hora] ou [dia, hora, célula])
+    e, opcionalmente, cell_latitudes e cell_longitudes.
+    """
+    file_path = str(file_path)
+    if file_path.endswith('.npz'):
+        arrays = np.load(file_path)
+        return WeatherForecast.from_arrays(
+            arrays['days'], arrays['hours'], arrays['wind_speed'], arrays['wind_direction'],
+            arrays['cell_latitudes'] if 'cell_latitudes' in arrays else None,
+            arrays['cell_longitudes'] if 'cell_longitudes' in arrays else None,
+            interpolate=interpolate, resolution_minutes=resolution_minutes
+        )
+
+    df = pd.read_csv(file_path)
+    df['hour'] = [_hour_value(hour) for hour in df['hour']]
+    spatial = 'latitude' in df.columns and 'longitude' in df.columns
+    cells = df[['latitude', 'longitude']].drop_duplicates().to_numpy() if spatial else np.zeros((1, 2))
+    days = sorted(df['day'].unique())
+    hours = sorted(df['hour'].unique())
+
+    speed = np.full((len(days), len(hours), len(cells)), np.nan)
+    direction = np.empty((len(days), len(hours), len(cells)), dtype=object)
+    direction[:] = np.nan
+    for row in df.itertuples(index=False):
+        cell = int(np.flatnonzero((cells == [row.latitude, row.longitude]).all(axis=1))[0]) if spatial else 0
+        speed[days.index(row.day), hours.index(row.hour), cell] = row.wind_speed
+        direction[days.index(row.day), hours.index(row.hour), cell] = row.wind_direction
+
+    return WeatherForecast.from_arrays(
+        [int(day) for day in days], hours, speed, direction,
+        cells[:, 0] if spatial else None, cells[:, 1] if spatial else None,
+        interpolate=interpolate, resolution_minutes=resolution_minutes
+    )
+
+
+def _hour_value(hour):
+    """Hora como número (aceita 6, '6', '06:30' ou '06h')"""
+    if isinstance(hour, str):
+        hour = hour.rstrip('h')
+        if ':' in hour:
+            h, m = hour.split(':')[:2]
+            return int(h) + int(m) / 60
+    return float(hour)
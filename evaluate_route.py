@@ -0,0 +1,47 @@
+import argparse
+import pandas as pd
+from drone_optimizer.drone_model import Drone
+from drone_optimizer.weather_model import WeatherForecast, load_forecast
+from drone_optimizer.route_evaluator import load_route, evaluate_route
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Avalia rotas exportadas (formato best_solution.csv) sem executar o AG"
+    )
+    parser.add_argument('routes', nargs='+', help="Arquivos CSV de rota")
+    parser.add_argument('--legs', action='store_true', help="Exibe o detalhamento por trecho")
+    parser.add_argument('--legs-output', help="Salva o detalhamento por trecho em CSV")
+    parser.add_argument('--forecast', help="Previsão de vento em CSV ou .npz (padrão: previsão embutida)")
+    parser.add_argument('--interpolate', action='store_true',
+                        help="Interpola o vento linearmente entre os horários da previsão")
+    args = parser.parse_args()
+
+    drone = Drone()
+    weather = load_forecast(args.forecast, interpolate=args.interpolate) if args.forecast else WeatherForecast()
+
+    for file_path in args.routes:
+        route, speeds, recharges = load_route(file_path)
+        result = evaluate_route(route, speeds, recharges, drone, weather,
+                                legs=args.legs or bool(args.legs_output))
+
+        print(f"\n--- {file_path} ---")
+        print(f"Válida: {'SIM' if result['is_valid'] else 'NAO'}")
+        if not result['is_valid']:
+            print(f"Erro: {result['error']} (trecho {result['fail_leg']})")
+            print(f"Violação: {result['violation']:.3f}")
+        print(f"Fitness: {result['fitness']:.6f}")
+        print(f"Custo total: R$ {result['total_cost']:.2f}")
+        print(f"Tempo total de voo: {result['total_flight_time']/3600:.2f} horas")
+        print(f"Número de recargas: {result['num_recharges']}")
+        print(f"Dias utilizados: {result['days_used']}")
+
+        if 'legs' in result:
+            legs_df = pd.DataFrame(result['legs'])
+            if args.legs:
+                print(legs_df.to_string(index=False))
+            if args.legs_output:
+                legs_df.to_csv(args.legs_output, index=False)
+                print(f"Detalhamento exportado para {args.legs_output}")
+
+if __name__ == "__main__":
+    main()
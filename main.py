@@ -2,8 +2,13 @@ import numpy as np
 import pandas as pd
 from drone_optimizer.genetic_algorithm import GeneticAlgorithm
 from drone_optimizer.drone_model import Drone
-from drone_optimizer.weather_model import WeatherForecast
-from drone_optimizer.csv_exporter import export_solution
+from drone_optimizer.weather_model import WeatherForecast, load_forecast
+from drone_optimizer.csv_exporter import (export_solution, export_fleet_solution, export_replanned_solution,
+                                         export_pareto_front)
+from drone_optimizer.fleet import FleetOptimizer
+from drone_optimizer.hierarchical import HierarchicalSolver
+from drone_optimizer.replan import RollingReplanner
+from drone_optimizer.pareto import ParetoGeneticAlgorithm
 import time
 
 def load_ceps_coordinates(file_path):
@@ -32,7 +37,32 @@ def main():
         'mutation_rate': 0.02,   # Mais baixo para estabilidade
         'crossover_rate': 0.7,   # Mais baixo inicialmente
         'elitism_count': 5,
-        'tournament_size': 3
+        'tournament_size': 3,
+        'adaptive_rates': False, # Taxas de mutação/crossover sobem quando a diversidade cai
+        'diversity_target': 0.5, # Entropia de arestas a partir da qual as taxas ficam nas do config
+        'max_mutation_rate': 0.3,  # Taxa de mutação com a população colapsada
+        'restart_threshold': None,  # Fração de genomas distintos abaixo da qual reinicia (None = nunca)
+        'restart_patience': 10,  # Gerações colapsadas e sem melhora antes de reiniciar
+        'repair': True,          # Inválidos são reparados (velocidades/recargas) em vez de descartados
+        'repair_attempts': 3,    # Rodadas de reparo por geração
+        'seed': None,            # Inteiro para execuções reproduzíveis
+        'fleet_size': 1,         # Número de drones (> 1 ativa o modo frota)
+        'workers': None,         # Processos paralelos (None = todos os núcleos)
+        'shared_data': False,    # CEPs e distâncias em memória compartilhada para os workers
+        'pair_data': 'auto',     # 'dense' (n x n), None (pares sob demanda) ou 'auto' (pelo nº de CEPs)
+        'pair_dtype': 'float64', # Precisão das tabelas ('float32' usa metade da memória)
+        'shared_backend': 'shared_memory',  # Ou 'memmap' (arquivos .npy mapeados)
+        'hierarchical': False,   # Cluster primeiro, rota depois (10k+ CEPs)
+        'pareto': False,         # NSGA-II: frente de Pareto de custo x dias x recargas
+        'cluster_size': 200,     # CEPs por cluster no modo hierárquico
+        'speed_decoder': False,  # Velocidades e recargas por programação dinâmica
+        'decoder_labels': 16,    # Estados de bateria mantidos por trecho no decodificador
+        'drone_profile': None,   # Parâmetros alternativos do drone (ex.: {'max_speed': 80})
+        'forecast_file': None,   # Previsão de vento em CSV/.npz (None = previsão padrão)
+        'forecast_interpolate': False,  # Interpolação linear do vento entre horários
+        'replan_from': None,     # Plano em execução (CSV) para replanejar só o restante
+        'executed_legs': 0,      # Trechos do plano já executados (ficam fixos)
+        'replan_generations': 100  # Gerações do AG no replanejamento
     }
     
     print("Carregando coordenadas dos CEPs...")
@@ -41,14 +71,32 @@ def main():
         print("Encerrando execução: dados necessários não encontrados.")
         return
     print("Inicializando modelos...")
-    weather = WeatherForecast()
-    drone = Drone()
+    if config['forecast_file']:
+        weather = load_forecast(config['forecast_file'], interpolate=config['forecast_interpolate'])
+    else:
+        weather = WeatherForecast()
+    drone = Drone.from_profile(config['drone_profile']) if config['drone_profile'] else Drone()
+    
+    if config['replan_from']:
+        run_replan(config, drone, weather)
+        return
+    
+    if config['fleet_size'] > 1:
+        run_fleet(config, ceps, drone, weather)
+        return
+    
+    if config['pareto']:
+        run_pareto(config, ceps, drone, weather)
+        return
     
     print("Iniciando algoritmo genético...")
     start_time = time.time()
     
-    ga = GeneticAlgorithm(config, ceps, drone, weather)
-    best_solution, fitness_history = ga.run()
+    if config['hierarchical']:
+        best_solution = HierarchicalSolver(config, ceps, drone, weather).run()
+    else:
+        ga = GeneticAlgorithm(config, ceps, drone, weather)
+        best_solution, fitness_history = ga.run()
     
     end_time = time.time()
     
@@ -65,5 +113,64 @@ def main():
     
     print("Processo concluído! Verifique o arquivo 'data/best_solution.csv'")
 
+def run_replan(config, drone, weather):
+    """Replanejamento: mantém os trechos executados e otimiza só o restante"""
+    print(f"Replanejando {config['replan_from']} após {config['executed_legs']} trechos executados...")
+    start_time = time.time()
+    
+    best_solution, fitness_history = RollingReplanner(config, drone, weather).run(
+        config['replan_from'], config['executed_legs'])
+    
+    end_time = time.time()
+    
+    print(f"\n--- RESULTADOS DO REPLANEJAMENTO ---")
+    print(f"Tempo de execução: {end_time - start_time:.2f} segundos")
+    print(f"Custo do restante: R$ {best_solution.total_cost:.2f}")
+    print(f"Dias utilizados: {best_solution.days_used}")
+    print(f"Válida: {'SIM' if best_solution.is_valid else 'NAO'}")
+    
+    print("\nExportando solução para CSV...")
+    export_replanned_solution(config['replan_from'], config['executed_legs'], best_solution,
+                              'data/replanned_solution.csv')
+
+def run_pareto(config, ceps, drone, weather):
+    """Modo Pareto: uma execução do NSGA-II e todas as soluções não dominadas"""
+    print("Iniciando NSGA-II...")
+    start_time = time.time()
+    
+    front, front_history = ParetoGeneticAlgorithm(config, ceps, drone, weather).run()
+    
+    end_time = time.time()
+    
+    print(f"\n--- FRENTE DE PARETO ---")
+    print(f"Tempo de execução: {end_time - start_time:.2f} segundos")
+    for solution_id, solution in enumerate(front, start=1):
+        print(f"Solução {solution_id}: custo R$ {solution.total_cost:.2f}, "
+              f"{solution.days_used} dias, {solution.num_recharges} recargas")
+    
+    print("\nExportando frente para CSV...")
+    export_pareto_front(front, 'data/pareto_front.csv')
+
+def run_fleet(config, ceps, drone, weather):
+    """Modo frota: uma sub-rota por drone, otimizadas em paralelo"""
+    print(f"Iniciando modo frota com {config['fleet_size']} drones...")
+    start_time = time.time()
+    
+    fleet = FleetOptimizer(config, ceps, drone, weather)
+    solutions, total_cost = fleet.run()
+    
+    end_time = time.time()
+    
+    print(f"\n--- RESULTADOS DA FROTA ---")
+    print(f"Tempo de execução: {end_time - start_time:.2f} segundos")
+    print(f"Custo total: R$ {total_cost:.2f}")
+    for drone_id, solution in enumerate(solutions, start=1):
+        print(f"Drone {drone_id}: {len(solution.route) - 2} CEPs, "
+              f"custo R$ {solution.total_cost:.2f}, {solution.days_used} dias, "
+              f"{'válida' if solution.is_valid else 'inválida'}")
+    
+    print("\nExportando solução para CSV...")
+    export_fleet_solution(solutions, 'data/best_fleet_solution.csv')
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
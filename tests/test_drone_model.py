@@ -48,4 +48,43 @@ def test_speed_validation():
     assert drone.validate_speed(96) == True
     assert drone.validate_speed(35) == False
     assert drone.validate_speed(97) == False
-    assert drone.validate_speed(37) == False  # Não é múltiplo de 4
\ No newline at end of file
+    assert drone.validate_speed(37) == False  # Não é múltiplo de 4
+
+def test_speed_tables():
+    drone = Drone()
+    
+    assert list(drone.speeds) == drone.get_available_speeds()
+    
+    # Quem altera a lista recebida não altera o drone; as tabelas são só leitura
+    drone.get_available_speeds().append(100)
+    assert drone.get_available_speeds()[-1] == 96
+    with pytest.raises(ValueError):
+        drone.autonomy_table[0] = 0
+    for i, speed in enumerate(drone.get_available_speeds()):
+        assert drone.speed_index(speed) == i
+        assert abs(drone.autonomy_table[i] - 4650 * (36 / speed) ** 2) < 1e-9
+        assert abs(drone.seconds_per_km[i] * 10 - drone.calculate_energy_consumption(10, speed)) < 1e-9
+
+def test_drone_profile():
+    profile = {'max_speed': 60, 'min_speed': 30, 'speed_step': 5, 'base_autonomy': 3000}
+    drone = Drone.from_profile(profile)
+    
+    assert drone.get_available_speeds() == [30, 35, 40, 45, 50, 55, 60]
+    assert abs(drone.calculate_autonomy(30) - 3000 * (36 / 30) ** 2) < 1e-9
+    assert drone.validate_speed(35) == True
+    assert drone.validate_speed(36) == False
+    
+    # Perfis iguais reaproveitam as tabelas, mas cada chamada recebe um drone próprio
+    other = Drone.from_profile(dict(profile))
+    assert other is not drone
+    assert other.autonomy_table is drone.autonomy_table
+    
+    # Alterar um parâmetro refaz as tabelas só daquele drone
+    other.max_speed = 50
+    assert other.get_available_speeds() == [30, 35, 40, 45, 50]
+    assert len(other.autonomy_table) == 5
+    assert other.validate_speed(55) == False
+    assert drone.get_available_speeds() == [30, 35, 40, 45, 50, 55, 60]
+    other.base_autonomy = 1500
+    assert abs(other.calculate_autonomy(30) - 1500 * (36 / 30) ** 2) < 1e-9
+    assert abs(drone.calculate_autonomy(30) - 3000 * (36 / 30) ** 2) < 1e-9
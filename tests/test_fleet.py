@@ -0,0 +1,68 @@
+import pytest
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from drone_optimizer.fleet import FleetOptimizer, split_ceps_into_clusters
+from drone_optimizer.drone_model import Drone
+from drone_optimizer.weather_model import WeatherForecast
+
+@pytest.fixture
+def sample_ceps():
+    ceps = [{'cep': '82821020', 'latitude': -25.548, 'longitude': -49.238}]
+    for i in range(12):
+        ceps.append({'cep': f'8001{i:04d}', 'latitude': -25.50 + (i % 4) * 0.01,
+                     'longitude': -49.26 + (i // 4) * 0.02})
+    return ceps
+
+def test_split_ceps_into_clusters(sample_ceps):
+    clusters = split_ceps_into_clusters(sample_ceps, 3)
+    
+    assert len(clusters) == 3
+    assert all(cluster[0]['cep'] == '82821020' for cluster in clusters)
+    assert sorted(len(cluster) - 1 for cluster in clusters) == [4, 4, 4]
+    
+    # Cada CEP fica em exatamente um cluster
+    assigned = [cep['cep'] for cluster in clusters for cep in cluster[1:]]
+    assert sorted(assigned) == sorted(cep['cep'] for cep in sample_ceps[1:])
+
+def test_fleet_optimizer_covers_all_ceps(sample_ceps):
+    config = {
+        'population_size': 10,
+        'generations': 5,
+        'mutation_rate': 0.1,
+        'crossover_rate': 0.8,
+        'elitism_count': 2,
+        'tournament_size': 3,
+        'seed': 7,
+        'fleet_size': 3,
+        'workers': 2
+    }
+    
+    solutions, total_cost = FleetOptimizer(config, sample_ceps, Drone(), WeatherForecast()).run()
+    
+    assert len(solutions) == 3
+    visited = [p['cep'] for solution in solutions for p in solution.route[1:-1]]
+    assert sorted(visited) == sorted(cep['cep'] for cep in sample_ceps[1:])
+    for solution in solutions:
+        assert solution.route[0]['cep'] == '82821020'
+        assert solution.route[-1]['cep'] == '82821020'
+    assert total_cost == pytest.approx(sum(solution.total_cost for solution in solutions))
+
+def test_boundary_ceps_follow_sweep_across_pi():
+    depot = {'cep': '82821020', 'latitude': -25.548, 'longitude': -49.238}
+    degrees = [100, 120, 140, 160, -160, -140]
+    ceps = [depot] + [{'cep': f'8002{i:04d}',
+                       'latitude': depot['latitude'] + 0.01 * np.sin(np.radians(angle)),
+                       'longitude': depot['longitude'] + 0.01 * np.cos(np.radians(angle))}
+                      for i, angle in enumerate(degrees)]
+    
+    # A varredura começa em 100° (depois do maior vão); o segundo setor cruza +-180°
+    clusters = split_ceps_into_clusters(ceps, 2)
+    assert [cep['cep'] for cep in clusters[1][1:]] == ['80020003', '80020004', '80020005']
+    
+    fleet = FleetOptimizer({'fleet_size': 2}, ceps, Drone(), WeatherForecast())
+    genome = {'route': [0, 4, 5, 6, 0]}
+    assert fleet._boundary_ceps(genome, 1, from_end=False) == [4]  # 160°, vizinho do primeiro setor
+    assert fleet._boundary_ceps(genome, 1, from_end=True) == [6]
@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
@@ -6,6 +7,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from drone_optimizer.genetic_algorithm import Individual, GeneticAlgorithm
 from drone_optimizer.drone_model import Drone
 from drone_optimizer.weather_model import WeatherForecast
+from drone_optimizer.route_evaluator import FAIL_DEADLINE
 
 @pytest.fixture
 def sample_ceps():
@@ -114,4 +116,227 @@ def test_crossover_creates_valid_offspring(sample_ceps, sample_drone, sample_wea
         assert child.route[0]['cep'] == '82821020'  # Começa no Unibrasil
         assert child.route[-1]['cep'] == '82821020'  # Termina no Unibrasil
         assert len(child.speeds) == len(child.route) - 1
-        assert len(child.recharges) == len(child.route) - 1
\ No newline at end of file
+        assert len(child.recharges) == len(child.route) - 1
+
+def test_population_views_share_storage(sample_ceps, sample_drone, sample_weather):
+    config = {
+        'population_size': 10,
+        'generations': 5,
+        'mutation_rate': 0.1,
+        'crossover_rate': 0.8,
+        'elitism_count': 2,
+        'tournament_size': 3
+    }
+    
+    ga = GeneticAlgorithm(config, sample_ceps, sample_drone, sample_weather)
+    individual = ga.population[3]
+    
+    assert not hasattr(individual, '__dict__')
+    assert individual.fitness == ga.population.fitness[3]
+    
+    # Genes alterados pela visão são gravados nos arrays da população
+    individual.recharges = [True] * len(individual.recharges)
+    assert ga.population.recharges(3).all()
+    individual.speeds = [96] * len(individual.speeds)
+    assert (ga.population.speeds(3) == 96).all()
+    
+    # Cópias são independentes da população de origem
+    copy = individual.copy()
+    copy.speeds = [36] * len(copy.speeds)
+    assert individual.speeds[0] == 96
+    assert copy != individual
+
+
+def test_elitism_and_best_tracking(sample_ceps, sample_drone, sample_weather):
+    config = {
+        'population_size': 20,
+        'generations': 10,
+        'mutation_rate': 0.1,
+        'crossover_rate': 0.8,
+        'elitism_count': 3,
+        'tournament_size': 3
+    }
+    
+    ga = GeneticAlgorithm(config, sample_ceps, sample_drone, sample_weather)
+    population = ga.population
+    
+    elite_rows = ga._elite_rows()
+    valid_fitness = sorted(population.fitness[population.is_valid], reverse=True)
+    assert list(population.fitness[elite_rows]) == valid_fitness[:len(elite_rows)]
+    
+    parents = ga._tournament_rows(50)
+    assert parents.shape == (50,)
+    assert ((parents >= 0) & (parents < len(population))).all()
+    
+    best, history = ga.run()
+    assert all(later >= earlier for earlier, later in zip(history, history[1:]))
+    assert best.fitness == history[-1]
+
+
+def test_batch_operators_keep_permutations(sample_drone, sample_weather):
+    ceps = [{'cep': '82821020', 'latitude': -25.548, 'longitude': -49.238}]
+    ceps += [{'cep': f'8000{i:04d}', 'latitude': -25.40 - i * 0.002, 'longitude': -49.26 - i * 0.001}
+             for i in range(30)]
+    config = {
+        'population_size': 40,
+        'generations': 5,
+        'mutation_rate': 0.5,
+        'crossover_rate': 1.0,
+        'elitism_count': 2,
+        'tournament_size': 3
+    }
+    
+    ga = GeneticAlgorithm(config, ceps, sample_drone, sample_weather)
+    children = ga.population.take(np.arange(40))
+    ga._crossover_batch(children, np.arange(20))
+    ga._mutate_batch(children)
+    
+    depot = children.depot
+    assert (children.routes[:, 0] == depot).all()
+    assert (children.routes[:, -1] == depot).all()
+    expected = sorted(children.others)
+    for route in children.routes:
+        assert sorted(route[1:-1]) == expected
+    assert (children.speed_idx < len(children.speed_values)).all()
+
+
+def test_seed_reproduces_fitness_history(sample_ceps, sample_drone, sample_weather):
+    config = {
+        'population_size': 20,
+        'generations': 15,
+        'mutation_rate': 0.2,
+        'crossover_rate': 0.8,
+        'elitism_count': 2,
+        'tournament_size': 3,
+        'seed': 1234
+    }
+    
+    _, history1 = GeneticAlgorithm(config, sample_ceps, sample_drone, sample_weather).run()
+    _, history2 = GeneticAlgorithm(config, sample_ceps, sample_drone, sample_weather).run()
+    assert history1 == history2
+    
+    # Sementes filhas são independentes mas também reproduzíveis
+    ga = GeneticAlgorithm(config, sample_ceps, sample_drone, sample_weather)
+    seeds = ga.spawn_seeds(2)
+    assert seeds[0].generate_state(1) != seeds[1].generate_state(1)
+    assert (GeneticAlgorithm(config, sample_ceps, sample_drone, sample_weather).spawn_seeds(2)[0]
+            .generate_state(1) == seeds[0].generate_state(1))
+
+
+def test_diversity_stats_and_adaptive_rates(sample_drone, sample_weather):
+    ceps = [{'cep': '82821020', 'latitude': -25.548, 'longitude': -49.238}]
+    ceps += [{'cep': f'8000{i:04d}', 'latitude': -25.40 - i * 0.002, 'longitude': -49.26 - i * 0.001}
+             for i in range(20)]
+    config = {
+        'population_size': 30,
+        'generations': 20,
+        'mutation_rate': 0.02,
+        'crossover_rate': 0.7,
+        'elitism_count': 2,
+        'tournament_size': 3,
+        'seed': 5,
+        'adaptive_rates': True,
+        'restart_threshold': 0.5,
+        'restart_patience': 3
+    }
+    
+    ga = GeneticAlgorithm(config, ceps, sample_drone, sample_weather)
+    
+    # População de clones: um genoma distinto e nenhuma diversidade de arestas
+    clones = ga.population.take(np.zeros(30, dtype=np.int64))
+    assert clones.unique_genomes() == 1
+    assert clones.edge_entropy() == 0.0
+    assert ga.population.unique_genomes() == 30
+    assert ga.population.edge_entropy() > 0.5
+    
+    best, history = ga.run()
+    assert len(ga.stats_history) == 20
+    for stats in ga.stats_history:
+        assert stats['evaluations'] <= 28
+        assert config['mutation_rate'] <= stats['mutation_rate'] <= 0.3
+        assert config['crossover_rate'] <= stats['crossover_rate'] <= 1.0
+    
+    # Métricas dos filhos não reavaliados continuam iguais às de uma avaliação completa
+    population = ga.population.take(np.arange(30))
+    population.evaluate()
+    assert np.array_equal(population.fitness, ga.population.fitness)
+    assert np.array_equal(population.genome_hash, ga.population.genome_hash)
+    
+    # Reinício de uma população colapsada: reiniciados são reparados e contam como avaliações
+    ga.config['repair'] = True
+    ga.population = clones
+    ga.fitness_history = [best.fitness, best.fitness]
+    ga.stats_history[-1].update(unique_genomes=1, evaluations=0)
+    ga._collapsed_generations = config['restart_patience']
+    assert ga._restart_on_collapse(2)
+    assert ga.stats_history[-1]['evaluations'] >= 28
+    assert ga.population.unique_genomes() > 1
+
+def test_repair_makes_infeasible_individuals_valid(sample_drone, sample_weather):
+    rng = np.random.default_rng(0)
+    ceps = [{'cep': '82821020', 'latitude': -25.548, 'longitude': -49.238}]
+    ceps += [{'cep': f'8100{i:04d}', 'latitude': -25.55 + rng.random() * 0.25,
+              'longitude': -49.45 + rng.random() * 0.25} for i in range(300)]
+    config = {
+        'population_size': 10,
+        'generations': 5,
+        'mutation_rate': 0.1,
+        'crossover_rate': 0.8,
+        'elitism_count': 2,
+        'tournament_size': 3,
+        'seed': 1,
+        'repair_attempts': 10
+    }
+    
+    ga = GeneticAlgorithm(config, ceps, sample_drone, sample_weather)
+    population = ga.population
+    
+    # Metade em velocidade máxima (falta bateria), metade lenta e parando em todo CEP (estoura o prazo)
+    population.speed_idx[:5] = len(sample_drone.speeds) - 1
+    population.speed_idx[5:] = 0
+    population.set_recharges(np.arange(5, 10), np.ones((5, population.num_legs), dtype=bool))
+    population.evaluate()
+    
+    # Nas linhas de prazo, um trecho longo depois da falha em velocidade máxima: a falha
+    # continua sendo de prazo e o reparo não pode tratá-la como falta de bateria
+    distances, _ = ga.evaluator.leg_geometry(population.routes[5:])
+    for row, row_distances in zip(range(5, 10), distances):
+        late_leg = population.fail_leg[row] + 1 + np.argmax(row_distances[population.fail_leg[row] + 1:])
+        assert row_distances[late_leg] > 20
+        population.speed_idx[row, late_leg] = len(sample_drone.speeds) - 1
+    population.evaluate()
+    assert not population.is_valid.any()
+    assert (population.fail_code[:5] != FAIL_DEADLINE).all()
+    assert (population.fail_code[5:] == FAIL_DEADLINE).all()
+    assert (population.violation > 0).all()
+    
+    # Sem válidos, o torneio escolhe quem viola menos
+    winners = ga._tournament_rows(50)
+    assert (ga.population.violation[winners] <= np.median(population.violation)).mean() > 0.5
+    assert population.violation[ga._elite_rows()].max() <= np.sort(population.violation)[1]
+    ga.best_individual = None
+    ga.update_best_individual()
+    assert ga.best_individual.violation == population.violation.min()
+    
+    # Uma tentativa mexe só nos trechos do lado da falha
+    attempt = population.take(np.arange(10))
+    fail_leg = attempt.fail_leg.copy()
+    config['repair_attempts'] = 1
+    ga.repair(attempt, np.arange(10))
+    config['repair_attempts'] = 10
+    for row in range(10):
+        changed = (attempt.speed_idx[row] != population.speed_idx[row]) | \
+                  (attempt.recharges(row) != population.recharges(row))
+        if row < 5:
+            assert not changed[:fail_leg[row]].any()  # Bateria: só do trecho que falhou em diante
+        else:
+            assert not changed[fail_leg[row] + 1:].any()  # Prazo: só até o trecho que falhou
+    
+    evaluations = ga.repair(population, np.arange(10))
+    assert evaluations >= 10
+    assert population.is_valid.all()
+    assert (population.violation == 0).all()
+    
+    repaired = population.take(np.arange(10))
+    repaired.evaluate()
+    assert np.array_equal(repaired.fitness, population.fitness)
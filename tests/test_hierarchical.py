@@ -0,0 +1,58 @@
+import pytest
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from drone_optimizer.hierarchical import HierarchicalSolver, solve_open_path, _distance_matrix
+from drone_optimizer.drone_model import Drone
+from drone_optimizer.weather_model import WeatherForecast
+from drone_optimizer.csv_exporter import export_solution
+
+@pytest.fixture
+def sample_ceps():
+    rng = np.random.default_rng(3)
+    ceps = [{'cep': '82821020', 'latitude': -25.548, 'longitude': -49.238}]
+    for i in range(150):
+        ceps.append({'cep': f'80{i:06d}', 'latitude': -25.55 + rng.random() * 0.1,
+                     'longitude': -49.30 + rng.random() * 0.1})
+    return ceps
+
+def test_solve_open_path_keeps_endpoints():
+    rng = np.random.default_rng(0)
+    latitudes = np.radians(-25.5 + rng.random(30) * 0.05)
+    longitudes = np.radians(-49.3 + rng.random(30) * 0.05)
+    distances = _distance_matrix(latitudes, longitudes)
+    
+    path = solve_open_path(distances, 4, 9)
+    
+    assert path[0] == 4 and path[-1] == 9
+    assert sorted(path) == list(range(30))
+    
+    # 2-opt não piora o caminho em relação à ordem natural com as mesmas pontas
+    naive = [4] + [i for i in range(30) if i not in (4, 9)] + [9]
+    length = lambda p: sum(distances[a, b] for a, b in zip(p, p[1:]))
+    assert length(path) <= length(naive)
+
+def test_hierarchical_solver_builds_full_route(sample_ceps, tmp_path):
+    config = {
+        'population_size': 10,
+        'generations': 5,
+        'mutation_rate': 0.1,
+        'crossover_rate': 0.8,
+        'elitism_count': 2,
+        'tournament_size': 3,
+        'seed': 5,
+        'cluster_size': 20,
+        'workers': 2
+    }
+    
+    solution = HierarchicalSolver(config, sample_ceps, Drone(), WeatherForecast()).run()
+    
+    assert solution.route[0]['cep'] == '82821020'
+    assert solution.route[-1]['cep'] == '82821020'
+    assert sorted(p['cep'] for p in solution.route[1:-1]) == sorted(c['cep'] for c in sample_ceps[1:])
+    assert len(solution.speeds) == len(solution.route) - 1
+    
+    export_solution(solution, tmp_path / 'route.csv')
+    assert (tmp_path / 'route.csv').exists()
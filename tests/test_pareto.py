@@ -0,0 +1,61 @@
+import pytest
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from drone_optimizer.pareto import ParetoGeneticAlgorithm, fast_non_dominated_sort, crowding_distance
+from drone_optimizer.drone_model import Drone
+from drone_optimizer.weather_model import WeatherForecast
+
+def dominates(a, b):
+    return (a <= b).all() and (a < b).any()
+
+def test_non_dominated_sort_and_crowding():
+    rng = np.random.default_rng(0)
+    objectives = rng.integers(0, 5, size=(50, 3)).astype(float)
+    ranks = fast_non_dominated_sort(objectives)
+
+    for i in range(50):
+        dominated = [j for j in range(50) if dominates(objectives[j], objectives[i])]
+        assert (ranks[i] == 0) == (len(dominated) == 0)
+        assert all(ranks[j] < ranks[i] for j in dominated)
+
+    # Pontas de cada objetivo numa frente ficam com distância infinita
+    line = np.array([[0.0, 4.0], [1.0, 3.0], [2.0, 2.0], [4.0, 0.0]])
+    distance = crowding_distance(line, np.zeros(4, dtype=np.int64))
+    assert np.isinf(distance[[0, 3]]).all()
+    assert distance[1] == pytest.approx(2 / 4 + 2 / 4)
+    assert distance[2] == pytest.approx(3 / 4 + 3 / 4)
+
+def test_pareto_ga_returns_non_dominated_front():
+    ceps = [{'cep': '82821020', 'latitude': -25.548, 'longitude': -49.238}]
+    ceps += [{'cep': f'8000{i:04d}', 'latitude': -25.40 - i * 0.002, 'longitude': -49.26 - i * 0.001}
+             for i in range(25)]
+    config = {
+        'population_size': 30,
+        'generations': 15,
+        'mutation_rate': 0.1,
+        'crossover_rate': 0.8,
+        'elitism_count': 2,
+        'tournament_size': 2,
+        'seed': 11
+    }
+
+    ga = ParetoGeneticAlgorithm(config, ceps, Drone(), WeatherForecast())
+    front, front_history = ga.run()
+
+    assert len(front) >= 1
+    assert len(front_history) == 15
+    points = np.array([[s.total_cost, s.days_used, s.num_recharges] for s in front])
+    assert all(s.is_valid for s in front)
+    assert list(points[:, 0]) == sorted(points[:, 0])
+    for a in points:
+        assert not any(dominates(b, a) for b in points)
+
+    # Nenhuma solução válida da população final domina a frente
+    population = ga.population
+    valid = np.column_stack([population.total_cost, population.days_used,
+                             population.num_recharges])[population.is_valid]
+    for a in points:
+        assert not any(dominates(b, a) for b in valid)
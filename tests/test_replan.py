@@ -0,0 +1,85 @@
+import pytest
+import sys
+import os
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from drone_optimizer.genetic_algorithm import Individual
+from drone_optimizer.drone_model import Drone
+from drone_optimizer.weather_model import WeatherForecast
+from drone_optimizer.route_evaluator import RouteEvaluator
+from drone_optimizer.csv_exporter import export_solution, export_replanned_solution
+from drone_optimizer.replan import RollingReplanner, _drop_revisits
+
+@pytest.fixture
+def sample_ceps():
+    ceps = [{'cep': '82821020', 'latitude': -25.548, 'longitude': -49.238}]
+    for i in range(8):
+        ceps.append({'cep': f'8001{i:04d}', 'latitude': -25.50 + (i % 4) * 0.01,
+                     'longitude': -49.26 + (i // 4) * 0.02})
+    return ceps
+
+def test_start_state_continues_route(sample_ceps):
+    drone = Drone()
+    weather = WeatherForecast()
+    evaluator = RouteEvaluator(sample_ceps, drone, weather)
+    route = np.array([0, 1, 2, 3, 4, 5, 6, 7, 8, 0])
+    speeds = np.full(9, 60)
+    recharges = np.zeros(9, dtype=bool)
+    full = evaluator.evaluate_batch(route[None], speeds[None], recharges[None], record_legs=True)
+
+    # Continuar do estado após 4 trechos dá o mesmo resultado que a rota inteira
+    k = 4
+    start_state = {'cep': sample_ceps[route[k]]['cep'], 'day': int(full['legs']['day'][0, k]),
+                   'time': full['legs']['start_time'][0, k], 'battery': full['legs']['battery'][0, k - 1]}
+    suffix = RouteEvaluator(sample_ceps, drone, weather, start_state).evaluate_batch(
+        route[None, k:], speeds[None, k:], recharges[None, k:])
+
+    assert suffix['is_valid'][0] == full['is_valid'][0]
+    assert suffix['days_used'][0] == full['days_used'][0]
+    assert suffix['total_flight_time'][0] == pytest.approx(full['legs']['flight_time'][0, k:].sum())
+
+def test_rolling_replan_keeps_prefix(sample_ceps, tmp_path):
+    drone = Drone()
+    weather = WeatherForecast()
+    plan = Individual(sample_ceps, drone, weather, np.random.default_rng(3))
+    schedule = tmp_path / 'best_solution.csv'
+    export_solution(plan, schedule)
+
+    config = {
+        'population_size': 10,
+        'generations': 500,
+        'replan_generations': 5,
+        'mutation_rate': 0.1,
+        'crossover_rate': 0.8,
+        'elitism_count': 2,
+        'tournament_size': 3,
+        'seed': 7
+    }
+    best, fitness_history = RollingReplanner(config, drone, weather).run(schedule, 3)
+
+    assert len(fitness_history) == 5
+    assert best.route[0]['cep'] == plan.route[3]['cep']
+    assert best.route[-1]['cep'] == '82821020'
+    assert sorted(p['cep'] for p in best.route[1:-1]) == sorted(p['cep'] for p in plan.route[4:-1])
+    assert best.start_state['day'] == 1
+
+    output = tmp_path / 'replanned_solution.csv'
+    export_replanned_solution(schedule, 3, best, output)
+    df = pd.read_csv(output, dtype={'CEP_inicial': str, 'CEP_final': str})
+    assert len(df) == len(plan.route) - 1
+    assert list(df['CEP_inicial'][:3]) == [p['cep'] for p in plan.route[:3]]
+    assert df['Hora_inicial'][3] == best.departure_times[0]
+
+def test_drop_revisits_keeps_genes_aligned():
+    route = [{'cep': c} for c in ['A', 'B', 'C', 'B', 'D', 'Z']]
+    speeds = [40, 44, 48, 52, 56]
+    recharges = [False, False, True, False, True]
+
+    route, speeds, recharges = _drop_revisits(route, speeds, recharges)
+
+    # C -> B -> D vira C -> D, com a recarga planejada do trecho que partia de C
+    assert [p['cep'] for p in route] == ['A', 'B', 'C', 'D', 'Z']
+    assert speeds == [40, 44, 48, 56]
+    assert recharges == [False, False, True, True]
@@ -0,0 +1,99 @@
+import pytest
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from drone_optimizer.genetic_algorithm import Individual
+from drone_optimizer.drone_model import Drone
+from drone_optimizer.weather_model import WeatherForecast
+from drone_optimizer.route_evaluator import RouteEvaluator, evaluate_route, load_route
+
+@pytest.fixture
+def sample_ceps():
+    return [
+        {'cep': '82821020', 'latitude': -25.548, 'longitude': -49.238},
+        {'cep': '80010010', 'latitude': -25.428, 'longitude': -49.267},
+        {'cep': '80020020', 'latitude': -25.435, 'longitude': -49.275},
+        {'cep': '80030030', 'latitude': -25.442, 'longitude': -49.283},
+        {'cep': '80040040', 'latitude': -25.449, 'longitude': -49.291}
+    ]
+
+def test_evaluate_route_matches_individual(sample_ceps):
+    drone = Drone()
+    weather = WeatherForecast()
+
+    for _ in range(20):
+        individual = Individual(sample_ceps, drone, weather)
+        result = evaluate_route(individual.route, individual.speeds, individual.recharges,
+                                drone, weather)
+
+        assert result['is_valid'] == individual.is_valid
+        if individual.is_valid:
+            assert abs(result['fitness'] - individual.fitness) < 1e-9
+            assert abs(result['total_cost'] - individual.total_cost) < 1e-6
+            assert result['num_recharges'] == individual.num_recharges
+            assert result['days_used'] == individual.days_used
+            assert len(result['legs']) == len(individual.route) - 1
+
+def test_reference_route_matches_original_rules():
+    # Cópia de data/best_solution.csv (que main.py sobrescreve); os valores esperados
+    # vêm da implementação original de Individual._calculate_metrics
+    route, speeds, recharges = load_route(os.path.join(os.path.dirname(__file__), 'data', 'reference_route.csv'))
+    result = evaluate_route(route, speeds, recharges, Drone(), WeatherForecast(), legs=False)
+
+    assert result['is_valid']
+    assert result['total_cost'] == pytest.approx(3131.8588986, abs=1e-6)
+    assert result['num_recharges'] == 169
+    assert result['days_used'] == 6
+    assert result['fitness'] == pytest.approx(-0.0021545815558, abs=1e-12)
+
+def test_evaluate_batch_matches_single(sample_ceps):
+    drone = Drone()
+    evaluator = RouteEvaluator(sample_ceps, drone, WeatherForecast())
+    rng = np.random.default_rng(0)
+
+    routes = np.array([[0] + list(rng.permutation(4) + 1) + [0] for _ in range(50)])
+    speeds = rng.choice(drone.get_available_speeds(), size=(50, 5))
+    recharges = rng.random((50, 5)) < 0.2
+
+    batch = evaluator.evaluate_batch(routes, speeds, recharges)
+    for i in range(50):
+        route = [sample_ceps[j] for j in routes[i]]
+        single = evaluator.evaluate(route, list(speeds[i]), list(recharges[i]), legs=False)
+        assert single['is_valid'] == batch['is_valid'][i]
+        assert abs(single['fitness'] - batch['fitness'][i]) < 1e-12
+
+def test_invalid_route_reports_failure(sample_ceps):
+    drone = Drone()
+    # Trecho longo na velocidade máxima sem autonomia suficiente
+    far_cep = {'cep': '99999999', 'latitude': -24.0, 'longitude': -49.238}
+    route = [sample_ceps[0], far_cep, sample_ceps[0]]
+
+    result = evaluate_route(route, [96, 96], [False, False], drone, WeatherForecast())
+
+    assert not result['is_valid']
+    assert result['error'] == "Bateria insuficiente"
+    assert result['fail_leg'] == 0
+
+    # Violação: trechos não completados mais a fração da autonomia que faltou
+    assert result['violation'] == 3.0  # falta maior que a autonomia inteira conta como 1
+    closer = dict(far_cep, latitude=-25.3)
+    shorter = evaluate_route([sample_ceps[0], closer, sample_ceps[0]], [96, 96], [False, False],
+                             drone, WeatherForecast())
+    assert 2 < shorter['violation'] < result['violation']
+    assert result['fitness'] < shorter['fitness'] < 0.0001
+
+def test_load_route_roundtrip(tmp_path, sample_ceps):
+    drone = Drone()
+    weather = WeatherForecast()
+    individual = Individual(sample_ceps, drone, weather)
+
+    from drone_optimizer.csv_exporter import export_solution
+    file_path = tmp_path / 'route.csv'
+    export_solution(individual, file_path)
+
+    route, speeds, recharges = load_route(file_path)
+    assert [p['cep'] for p in route] == [p['cep'] for p in individual.route]
+    assert speeds == individual.speeds
+    assert len(recharges) == len(speeds)
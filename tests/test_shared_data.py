@@ -0,0 +1,80 @@
+import pytest
+import sys
+import os
+import pickle
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from drone_optimizer.shared_data import SharedCepData, create_shared_data
+from drone_optimizer.route_evaluator import RouteEvaluator
+from drone_optimizer.hierarchical import HierarchicalSolver
+from drone_optimizer.drone_model import Drone
+from drone_optimizer.weather_model import WeatherForecast
+
+@pytest.fixture
+def sample_ceps():
+    rng = np.random.default_rng(3)
+    ceps = [{'cep': '82821020', 'latitude': -25.548, 'longitude': -49.238}]
+    for i in range(60):
+        ceps.append({'cep': f'80{i:06d}', 'latitude': -25.55 + rng.random() * 0.1,
+                     'longitude': -49.30 + rng.random() * 0.1})
+    return ceps
+
+@pytest.mark.parametrize('backend', ['shared_memory', 'memmap'])
+@pytest.mark.parametrize('pair_data', ['dense', None])
+def test_shared_pairs_match_evaluator(sample_ceps, backend, pair_data):
+    drone = Drone()
+    weather = WeatherForecast()
+    rng = np.random.default_rng(0)
+    routes = np.array([np.r_[0, rng.permutation(np.arange(1, 61)), 0] for _ in range(10)])
+
+    with SharedCepData.create(sample_ceps, pair_data=pair_data, dtype=np.float32,
+                              backend=backend) as data:
+        # Outro processo recebe só o handle e anexa os mesmos arrays
+        attached = pickle.loads(pickle.dumps(data))
+        assert len(pickle.dumps(data)) < 2000
+        assert attached.ceps([0, 5]) == data.ceps([0, 5]) == [sample_ceps[0], sample_ceps[5]]
+
+        expected = RouteEvaluator(sample_ceps, drone, weather).leg_geometry(routes)
+        shared = RouteEvaluator(sample_ceps, drone, weather, shared_data=attached).leg_geometry(routes)
+        assert np.allclose(expected[0], shared[0], atol=1e-4)
+        assert np.allclose(expected[1], shared[1], atol=1e-5)
+        if pair_data is None:
+            # Sob demanda, os pares são os mesmos do avaliador sem dados compartilhados
+            assert np.array_equal(expected[0], shared[0])
+            assert np.array_equal(expected[1], shared[1])
+
+def test_default_dense_pairs_score_like_plain_runs(sample_ceps):
+    drone = Drone()
+    weather = WeatherForecast()
+    rng = np.random.default_rng(1)
+    routes = np.array([np.r_[0, rng.permutation(np.arange(1, 61)), 0] for _ in range(10)])
+    speeds = rng.choice(drone.speeds, size=(10, 61))
+    recharges = rng.random((10, 61)) < 0.1
+
+    # float64 por padrão: mesmas métricas, bit a bit, com ou sem dados compartilhados
+    with create_shared_data({'pair_data': 'dense'}, sample_ceps) as data:
+        plain = RouteEvaluator(sample_ceps, drone, weather).evaluate_batch(routes, speeds, recharges)
+        shared = RouteEvaluator(sample_ceps, drone, weather, shared_data=data).evaluate_batch(
+            routes, speeds, recharges)
+    assert np.array_equal(plain['fitness'], shared['fitness'])
+    assert np.array_equal(plain['total_cost'], shared['total_cost'])
+
+def test_hierarchical_solver_with_shared_data(sample_ceps):
+    config = {
+        'population_size': 10,
+        'generations': 5,
+        'mutation_rate': 0.1,
+        'crossover_rate': 0.8,
+        'elitism_count': 2,
+        'tournament_size': 3,
+        'seed': 5,
+        'cluster_size': 15,
+        'workers': 2,
+        'shared_data': True
+    }
+
+    solution = HierarchicalSolver(config, sample_ceps, Drone(), WeatherForecast()).run()
+    plain = HierarchicalSolver(dict(config, shared_data=False), sample_ceps, Drone(), WeatherForecast()).run()
+
+    assert [p['cep'] for p in solution.route] == [p['cep'] for p in plain.route]
@@ -0,0 +1,67 @@
+import pytest
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from drone_optimizer.speed_decoder import SpeedRechargeDecoder
+from drone_optimizer.route_evaluator import RouteEvaluator
+from drone_optimizer.genetic_algorithm import GeneticAlgorithm
+from drone_optimizer.drone_model import Drone
+from drone_optimizer.weather_model import WeatherForecast
+
+@pytest.fixture
+def sample_ceps():
+    rng = np.random.default_rng(11)
+    ceps = [{'cep': '82821020', 'latitude': -25.548, 'longitude': -49.238}]
+    for i in range(25):
+        ceps.append({'cep': f'80{i:06d}', 'latitude': -25.60 + rng.random() * 0.2,
+                     'longitude': -49.35 + rng.random() * 0.2})
+    return ceps
+
+def test_decoder_beats_random_assignments(sample_ceps):
+    drone = Drone()
+    evaluator = RouteEvaluator(sample_ceps, drone, WeatherForecast())
+    rng = np.random.default_rng(0)
+    routes = np.array([[0] + list(rng.permutation(25) + 1) + [0] for _ in range(5)])
+    
+    speed_idx, recharges = SpeedRechargeDecoder(evaluator).decode(routes)
+    speeds = np.array(drone.get_available_speeds())
+    decoded = evaluator.evaluate_batch(routes, speeds[speed_idx], recharges)
+    assert decoded['is_valid'].all()
+    
+    # Melhor que qualquer uma de 200 atribuições aleatórias para a mesma rota
+    for i, route in enumerate(routes):
+        random_speeds = rng.choice(speeds, size=(200, 26))
+        random_recharges = rng.random((200, 26)) < 0.2
+        baseline = evaluator.evaluate_batch(np.tile(route, (200, 1)), random_speeds, random_recharges)
+        best_random = baseline['total_cost'][baseline['is_valid']].min(initial=np.inf)
+        assert decoded['total_cost'][i] <= best_random
+
+def test_genetic_algorithm_with_decoder(sample_ceps):
+    config = {
+        'population_size': 10,
+        'generations': 3,
+        'mutation_rate': 0.1,
+        'crossover_rate': 0.8,
+        'elitism_count': 2,
+        'tournament_size': 3,
+        'seed': 2,
+        'speed_decoder': True
+    }
+    
+    ga = GeneticAlgorithm(config, sample_ceps, Drone(), WeatherForecast())
+    best, history = ga.run()
+    
+    assert ga.population.is_valid.all()
+    assert best.is_valid
+    
+    # Só rotas alteradas são decodificadas; os clones continuam com a atribuição ótima
+    decoded_rows = []
+    decode = ga._decode
+    ga._decode = lambda population, rows: (decoded_rows.append(len(rows)), decode(population, rows))
+    ga.run()
+    assert all(0 < count < 8 for count in decoded_rows)
+    speed_idx, recharges = ga.decoder.decode(ga.population.routes)
+    assert np.array_equal(speed_idx, ga.population.speed_idx)
+    assert np.array_equal(recharges, ga.population.recharges())
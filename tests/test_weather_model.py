@@ -0,0 +1,84 @@
+# tests/test_weather_model.py
+import pytest
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from drone_optimizer.drone_model import Drone
+from drone_optimizer.weather_model import WeatherForecast, load_forecast
+from drone_optimizer.route_evaluator import RouteEvaluator
+from drone_optimizer.route_calculator import RouteCalculator
+
+def test_default_forecast_lookup():
+    weather = WeatherForecast()
+
+    assert weather.get_wind_for_time(1, '06:00:00') == (17, 'ENE')
+    assert weather.get_wind_for_time(1, '08:30:00') == (18, 'E')  # Arredonda para 09h
+    assert weather.get_wind_for_time(1, '08:29:00') == (15, 'E')  # 08h sem previsão
+    assert weather.get_wind_for_time(9, '06:00:00') == (15, 'E')  # Dia sem previsão
+
+def test_load_forecast_csv_interpolation(tmp_path):
+    file_path = tmp_path / 'forecast.csv'
+    file_path.write_text(
+        "day,hour,wind_speed,wind_direction\n"
+        "1,06:00,10,N\n"
+        "1,08:00,20,E\n"
+    )
+
+    rounded = load_forecast(file_path)
+    assert rounded.get_wind_for_time(1, '06:29:00') == (10, 'N')
+    assert rounded.get_wind_for_time(1, '07:00:00') == (15, 'E')  # 07h sem previsão
+
+    interpolated = load_forecast(file_path, interpolate=True)
+    assert interpolated.get_wind_for_time(1, '07:00:00') == (15, 'NE')
+    wind_speed, wind_direction = interpolated.get_wind_for_time(1, '06:30:00')
+    assert abs(wind_speed - 12.5) < 1e-9
+    assert abs(wind_direction - np.degrees(np.arctan2(0.25, 0.75))) < 1e-6  # Graus fora da rosa dos ventos
+    assert interpolated.get_wind_for_time(1, '05:00:00') == (10, 'N')  # Antes do primeiro horário
+
+def test_spatial_forecast_in_evaluator(tmp_path):
+    file_path = tmp_path / 'forecast.npz'
+    np.savez(file_path, days=[1], hours=[6],
+             wind_speed=[[[0.0, 40.0]]], wind_direction=[[[0.0, 180.0]]],
+             cell_latitudes=[-25.40, -25.60], cell_longitudes=[-49.25, -49.25])
+    weather = load_forecast(file_path)
+    ceps = [
+        {'cep': 'norte', 'latitude': -25.41, 'longitude': -49.25},
+        {'cep': 'sul', 'latitude': -25.59, 'longitude': -49.25},
+    ]
+
+    evaluator = RouteEvaluator(ceps, Drone(), weather)
+    assert list(evaluator.cells) == [0, 1]
+
+    result = evaluator.evaluate_batch([[0, 1], [1, 0]], [[36], [36]], [[False], [False]], record_legs=True)
+    assert result['legs']['wind_speed_kmh'][0, 0] == 0  # Parte da célula sem vento
+    assert result['legs']['wind_speed_kmh'][1, 0] == 40
+
+    # O exportador (RouteCalculator) usa a mesma célula de partida
+    calculator = RouteCalculator()
+    for start, end in ((0, 1), (1, 0)):
+        params = calculator.calculate_flight_parameters(ceps[start], ceps[end], 36, weather, 1, '06:00:00')
+        assert params['wind_speed_kmh'] == result['legs']['wind_speed_kmh'][start, 0]
+
+def test_load_forecast_fractional_hours_and_gaps(tmp_path):
+    file_path = tmp_path / 'forecast.csv'
+    file_path.write_text(
+        "day,hour,wind_speed,wind_direction,latitude,longitude\n"
+        "1,06:00,10,N,-25.40,-49.25\n"
+        "1,06:30,20,S,-25.40,-49.25\n"
+        "1,07:00,30,W,-25.40,-49.25\n"
+        "1,07:00,40,N,-25.60,-49.25\n"
+    )
+
+    for interpolate in (False, True):
+        weather = load_forecast(file_path, interpolate=interpolate)
+        # Horário fracionário tem o próprio slot
+        assert weather.get_wind_for_time(1, '06:30:00', -25.40, -49.25) == (20, 'S')
+        # Célula sem 06h não herda lacuna (NaN) da outra célula
+        wind_speed, _ = weather.get_wind_for_time(1, '06:00:00', -25.60, -49.25)
+        assert not np.isnan(wind_speed)
+        assert weather.get_wind_for_time(1, '07:00:00', -25.60, -49.25) == (40, 'N')
+
+    rounded = load_forecast(file_path)
+    assert rounded.get_wind_for_time(1, '06:00:00', -25.60, -49.25) == (15, 'E')